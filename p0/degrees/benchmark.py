@@ -0,0 +1,205 @@
+import argparse
+import csv
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import degrees
+
+LOADERS = {
+    "dict": {},
+    "compact": {"compact": True},
+    "snapshot": {"snapshot": True},
+}
+MODES = ("bfs", "bidirectional", "cached", "alt")
+
+
+def generate(directory, people=20000, movies=8000, stars_per_movie=4, seed=0):
+    """
+    Writes synthetic people.csv, movies.csv and stars.csv files shaped
+    like the IMDB data: some actors appear in many movies, most in few,
+    and some names are shared by more than one person.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    with open(os.path.join(directory, "people.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for i in range(people):
+            # Roughly one name in fifty is reused
+            name = f"Person {i if rng.random() > 0.02 else rng.randrange(i + 1)}"
+            writer.writerow([100000 + i, name, rng.randint(1920, 2005)])
+
+    with open(os.path.join(directory, "movies.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for i in range(movies):
+            writer.writerow([5000000 + i, f"Movie {i}", rng.randint(1950, 2020)])
+
+    # Heavy-tailed popularity so a few actors become hubs
+    weights = [rng.paretovariate(1.5) for _ in range(people)]
+    with open(os.path.join(directory, "stars.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for i in range(movies):
+            cast = set(rng.choices(range(people), weights=weights, k=stars_per_movie))
+            for person in cast:
+                writer.writerow([100000 + person, 5000000 + i])
+
+
+def time_load(directory, loader):
+    """
+    Loads the dataset with one of LOADERS.
+
+    Returns (seconds, bytes) where bytes is the memory still allocated
+    by the loaded data, measured in a second, traced load.
+    """
+    start = time.perf_counter()
+    degrees.load_data(directory, **LOADERS[loader])
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    degrees.load_data(directory, **LOADERS[loader])
+    footprint, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, footprint
+
+
+def time_queries(pairs, mode):
+    """
+    Runs shortest_path over every pair and returns the latencies in seconds
+    together with the path lengths found.
+    """
+    latencies = []
+    lengths = []
+    for source, target in pairs:
+        start = time.perf_counter()
+        path = degrees.shortest_path(source, target, mode=mode)
+        latencies.append(time.perf_counter() - start)
+        lengths.append(None if path is None else len(path))
+    return latencies, lengths
+
+
+def percentile(values, fraction):
+    """
+    Returns the nearest-rank percentile of `values`.
+    """
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def sample_pairs(count, hubs, seed):
+    """
+    Returns `count` random (source, target) pairs, with sources drawn
+    from the `hubs` people with the most movies so repeated sources
+    exercise the cached mode.
+    """
+    rng = random.Random(seed)
+    person_ids = sorted(degrees.people)
+    popular = sorted(person_ids, key=degrees.movie_count, reverse=True)[:hubs]
+    return [(rng.choice(popular), rng.choice(person_ids)) for _ in range(count)]
+
+
+def run(directory, loaders, modes, queries, hubs, landmarks, seed):
+    """
+    Benchmarks each loader, and each search mode on the last loader.
+
+    Returns the results as a dictionary.
+    """
+    results = {"load": {}, "search": {}}
+    for loader in loaders:
+        if loader == "snapshot":
+            # Make the first timed load hit a fresh snapshot
+            degrees.load_data(directory, snapshot=True)
+        seconds, footprint = time_load(directory, loader)
+        results["load"][loader] = {"seconds": seconds, "bytes": footprint}
+        print(f"load {loader:>15}: {seconds:8.3f} s  {footprint / 2 ** 20:8.1f} MB")
+
+    if "alt" in modes:
+        degrees.load_landmarks(directory, landmarks)
+    pairs = sample_pairs(queries, hubs, seed)
+
+    reference = None
+    for mode in modes:
+        latencies, lengths = time_queries(pairs, mode)
+        if reference is None:
+            reference = lengths
+        elif lengths != reference:
+            raise RuntimeError(f"{mode} disagrees with {modes[0]} on path lengths")
+        summary = {
+            "p50": percentile(latencies, 0.50),
+            "p90": percentile(latencies, 0.90),
+            "p99": percentile(latencies, 0.99),
+            "max": max(latencies),
+        }
+        results["search"][mode] = summary
+        print(f"search {mode:>13}: " + "  ".join(
+            f"{name} {value * 1000:8.3f} ms" for name, value in summary.items()
+        ))
+    return results
+
+
+def regressions(results, baseline, tolerance):
+    """
+    Returns descriptions of timings in `results` more than `tolerance`
+    (a fraction) slower than the same timings in `baseline`.
+    """
+    slower = []
+    for loader, current in results["load"].items():
+        previous = baseline.get("load", {}).get(loader)
+        if previous and current["seconds"] > previous["seconds"] * (1 + tolerance):
+            slower.append(f"load {loader}: {previous['seconds']:.3f} s -> {current['seconds']:.3f} s")
+    for mode, current in results["search"].items():
+        previous = baseline.get("search", {}).get(mode)
+        if previous and current["p90"] > previous["p90"] * (1 + tolerance):
+            slower.append(f"search {mode} p90: {previous['p90'] * 1000:.3f} ms -> {current['p90'] * 1000:.3f} ms")
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark degrees loading and search.")
+    parser.add_argument("--directory", help="dataset to use; generated into a temporary directory if omitted")
+    parser.add_argument("--people", type=int, default=20000)
+    parser.add_argument("--movies", type=int, default=8000)
+    parser.add_argument("--stars-per-movie", type=int, default=4)
+    parser.add_argument("--loaders", nargs="+", choices=LOADERS, default=list(LOADERS))
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--hubs", type=int, default=20)
+    parser.add_argument("--landmarks", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", metavar="FILE", help="write the results as JSON")
+    parser.add_argument("--baseline", metavar="FILE", help="fail if slower than these saved results")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        directory = args.directory
+        if directory is None:
+            directory = scratch
+            print(f"Generating {args.people} people, {args.movies} movies...")
+            generate(directory, args.people, args.movies, args.stars_per_movie, args.seed)
+        results = run(directory, args.loaders, args.modes, args.queries,
+                      args.hubs, args.landmarks, args.seed)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            slower = regressions(results, json.load(f), args.tolerance)
+        for line in slower:
+            print(f"REGRESSION {line}")
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,15 @@
-import csv
+import argparse
+import json
+import multiprocessing
 import sys
 import time
 
+from distances import TreeCache
+from graph import CompactGraph
+from ingest import Progress, ingest, star_pairs
+from landmarks import LandmarkIndex, alt_search
+from search import bidirectional_search
+from snapshot import load_snapshot, save_snapshot
 from util import Node, StackFrontier, QueueFrontier
 
 # Maps names to a set of corresponding person_ids
@@ -13,57 +21,226 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Integer-indexed adjacency used instead of the movies/stars sets
+# when data is loaded with compact=True
+graph = None
 
-def load_data(directory):
+# Landmark distance oracle, set up by load_landmarks
+landmark_index = None
+
+# Year range the current data was loaded with, or None for the full dataset
+year_filter = None
+
+# Maps person_ids to a tuple of (movie_id, person_id) pairs with each
+# co-star listed once, when enabled by build_costar_index
+costars = None
+
+
+def load_data(directory, compact=False, snapshot=False, year_range=None,
+              parallel=False, progress=None):
     """
     Load data from CSV files into memory.
+
+    With `compact`, adjacency is stored in a CompactGraph and the
+    `people`/`movies` entries only keep their name, birth, title and year.
+
+    With `snapshot`, the compact data is mapped from a binary snapshot
+    next to the CSV files, which is (re)written whenever it is missing
+    or older than the CSV files.
+
+    With `year_range` = (first, last), only movies from those years and
+    the people starring in them are loaded. `parallel` reads people.csv
+    and movies.csv at once when loading the full dataset, and `progress`
+    (an ingest.Progress) reports throughput and memory growth as the
+    files are read.
     """
-    # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
-
-    # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
-
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
+    global names, people, movies, graph, landmark_index, costars, year_filter
+
+    if snapshot and year_range is not None:
+        raise ValueError("snapshots hold the full dataset; drop year_range")
+
+    # Start from empty data, and drop indexes built over earlier data
+    names, people, movies = {}, {}, {}
+    graph = None
+    tree_cache.clear()
+    landmark_index = None
+    costars = None
+    year_filter = None if year_range is None else tuple(year_range)
+
+    if snapshot:
+        loaded = load_snapshot(directory)
+        if loaded is not None:
+            graph, names, people, movies = loaded
+            return
+
+    if snapshot or compact:
+        load_compact(directory, year_range, parallel, progress)
+        if snapshot:
             try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+                save_snapshot(directory, graph, names, people, movies)
+            except OSError:
+                print("Could not write snapshot.", file=sys.stderr)
+        return
+
+    def add_person(row):
+        people[row["id"]] = {
+            "name": row["name"],
+            "birth": row["birth"],
+            "movies": set()
+        }
+        if row["name"].lower() not in names:
+            names[row["name"].lower()] = {row["id"]}
+        else:
+            names[row["name"].lower()].add(row["id"])
+
+    def add_movie(row):
+        movies[row["id"]] = {
+            "title": row["title"],
+            "year": row["year"],
+            "stars": set()
+        }
+
+    def add_star(person_id, movie_id):
+        try:
+            people[person_id]["movies"].add(movie_id)
+            movies[movie_id]["stars"].add(person_id)
+        except KeyError:
+            pass
+
+    ingest(directory, add_person, add_movie, add_star,
+           year_range=year_range, parallel=parallel, progress=progress)
+
+
+def load_compact(directory, year_range=None, parallel=False, progress=None):
+    """
+    Load data from CSV files into a CompactGraph.
+    """
+    global graph
+
+    def add_person(row):
+        people[row["id"]] = {
+            "name": row["name"],
+            "birth": row["birth"]
+        }
+        names.setdefault(row["name"].lower(), set()).add(row["id"])
+
+    def add_movie(row):
+        movies[row["id"]] = {
+            "title": row["title"],
+            "year": row["year"]
+        }
+
+    # Stars go straight from the file into the graph once people and
+    # movies are known
+    ingest(directory, add_person, add_movie, None,
+           year_range=year_range, parallel=parallel, progress=progress)
+    graph = CompactGraph.build(people, movies, star_pairs(
+        directory, None if year_range is None else movies, progress=progress
+    ))
+
+
+def build_costar_index(eager=False):
+    """
+    Enables the co-star index used by neighbors_for_person.
+
+    With `eager`, every person's co-stars are computed now; otherwise
+    each person's list is computed the first time they are expanded and
+    then reused. A compact graph always builds its CSR co-star arrays
+    up front.
+    """
+    global costars
+    costars = {}
+    if graph is not None:
+        graph.build_costars()
+    elif eager:
+        for person_id in people:
+            costars[person_id] = costars_for_person(person_id)
+
+
+def costars_for_person(person_id):
+    """
+    Returns a tuple of (movie_id, person_id) pairs with every co-star
+    of a given person listed once, through one movie they share.
+    """
+    shared = {}
+    for movie_id in people[person_id]["movies"]:
+        for costar in movies[movie_id]["stars"]:
+            if costar != person_id and costar not in shared:
+                shared[costar] = movie_id
+    return tuple((movie_id, costar) for costar, movie_id in shared.items())
+
+
+def load_landmarks(directory, k=8):
+    """
+    Loads the landmark index saved next to the dataset, or builds one
+    from the `k` people with the most movies and saves it. The saved
+    index is only reused for data loaded with the same year range.
+    """
+    global landmark_index
+    landmark_index = LandmarkIndex.load(directory, year_filter)
+    if landmark_index is None or len(landmark_index.landmarks) != min(k, len(people)):
+        landmark_index = LandmarkIndex.build(
+            people, neighbors_for_person, movie_count, k=k
+        )
+        try:
+            landmark_index.save(directory, year_filter)
+        except OSError:
+            print("Could not write landmark index.", file=sys.stderr)
 
 start_time = time.time()
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(usage="python degrees.py [directory]")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="answer tab-separated pairs from FILE ('-' for stdin)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes used to answer batch queries")
+    parser.add_argument("--mode", default="bidirectional",
+                        help="search strategy passed to shortest_path")
+    parser.add_argument("--compact", action="store_true",
+                        help="load into the integer-indexed graph")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="load from (and maintain) a binary snapshot")
+    parser.add_argument("--years", metavar="FIRST-LAST",
+                        help="only load movies released in these years")
+    parser.add_argument("--parallel-load", action="store_true",
+                        help="read people and movies at once when loading every year")
+    parser.add_argument("--progress", action="store_true",
+                        help="report rows/s and memory growth while loading")
+    parser.add_argument("--costars", choices=("lazy", "eager"),
+                        help="expand searches through the co-star index")
+    parser.add_argument("--landmarks", type=int, default=0, metavar="K",
+                        help="load or build a K-landmark index (needed by --mode alt)")
+    args = parser.parse_args()
+
+    # In batch mode stdout carries results, so progress goes to stderr
+    log = sys.stderr if args.batch else sys.stdout
 
     # Load data from files into memory
-    print("Loading data...")
-    load_data(directory)
-    print("Data loaded.")
-    print("--- %s seconds ---" % (time.time() - start_time))
-    
+    print("Loading data...", file=log)
+    year_range = None
+    if args.years:
+        first, _, last = args.years.partition("-")
+        year_range = (int(first), int(last or first))
+    load_data(args.directory, compact=args.compact, snapshot=args.snapshot,
+              year_range=year_range, parallel=args.parallel_load,
+              progress=Progress(log) if args.progress else None)
+    if args.costars:
+        build_costar_index(eager=args.costars == "eager")
+    if args.landmarks:
+        load_landmarks(args.directory, args.landmarks)
+    print("Data loaded.", file=log)
+    print("--- %s seconds ---" % (time.time() - start_time), file=log)
+
+    if args.batch:
+        if args.batch == "-":
+            run_batch(sys.stdin, sys.stdout, args.mode, args.workers)
+        else:
+            with open(args.batch, encoding="utf-8") as f:
+                run_batch(f, sys.stdout, args.mode, args.workers)
+        print("--- %s seconds ---" % (time.time() - start_time), file=log)
+        return
+
     while True:
         source = person_id_for_name(input("Actor 1:"))
         if source is None:
@@ -82,7 +259,7 @@ def main():
         else:
             break
 
-    path = shortest_path(source, target)
+    path = shortest_path(source, target, mode=args.mode)
 
     if path is None:
         print("Not connected.")
@@ -98,13 +275,34 @@ def main():
     print("--- %s seconds ---" % (time.time() - start_time))
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, mode="bfs"):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
+    `mode` selects the search strategy: "bfs" fans out from the source
+    only, "bidirectional" searches from both ends and meets in the middle,
+    "cached" answers from a cached single-source tree of either end,
+    and "alt" prunes a bidirectional search with landmark bounds.
+
     If no possible path, returns None.
     """
+    if mode == "alt":
+        if landmark_index is None:
+            raise ValueError("alt mode needs load_landmarks first")
+        return alt_search(source, target, neighbors_for_person, landmark_index)
+    if mode == "bidirectional":
+        if graph is not None:
+            return graph.bidirectional_path(source, target)
+        return bidirectional_search(source, target, neighbors_for_person)
+    if mode == "cached":
+        return tree_cache.shortest_path(source, target)
+    if mode != "bfs":
+        raise ValueError(f"unknown search mode: {mode}")
+
+    if graph is not None:
+        return graph.shortest_path(source, target)
+
     #Initialize frontier:-
     frontier = QueueFrontier()       #for BFS
     start = Node(source, None, None) #state -> people, action -> movies
@@ -141,7 +339,7 @@ def shortest_path(source, target):
                 
         #add node to explored set:-
         explored_set.add(node.state)
-        
+
 
 def person_id_for_name(name):
     """
@@ -169,11 +367,123 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def resolve_person(query):
+    """
+    Returns the IMDB id for a person's ID or name without prompting,
+    or None if there is no single match.
+    """
+    if query in people:
+        return query
+    person_ids = names.get(query.lower(), set())
+    if len(person_ids) == 1:
+        return next(iter(person_ids))
+    return None
+
+
+def answer_query(line, mode="bidirectional"):
+    """
+    Answers one batch line holding two actors (names or IDs) separated
+    by a tab, or by a comma if the line has no tab.
+
+    Returns a dictionary describing the result, ready to dump as JSON.
+    """
+    separator = "\t" if "\t" in line else ","
+    fields = [field.strip() for field in line.rstrip("\n").split(separator)]
+    if len(fields) != 2:
+        return {"query": line.rstrip("\n"), "error": "expected two actors"}
+
+    result = {"source": fields[0], "target": fields[1]}
+    source = resolve_person(fields[0])
+    target = resolve_person(fields[1])
+    for key, person_id in (("source", source), ("target", target)):
+        if person_id is None:
+            count = len(names.get(result[key].lower(), set()))
+            result["error"] = (f"{key} is ambiguous" if count > 1
+                               else f"{key} not found")
+            return result
+
+    path = shortest_path(source, target, mode=mode)
+    result["source_id"] = source
+    result["target_id"] = target
+    if path is None:
+        result["degrees"] = None
+        result["path"] = None
+    else:
+        result["degrees"] = len(path)
+        result["path"] = [
+            {"movie_id": movie_id, "person_id": person_id}
+            for movie_id, person_id in path
+        ]
+    return result
+
+
+def run_batch(lines, out, mode="bidirectional", workers=1):
+    """
+    Answers every non-blank line of `lines` and writes one JSON object
+    per line to `out`, in input order, flushing after each so results
+    stream through pipes.
+
+    With more than one worker, queries are spread over a pool of
+    forked processes that share the already loaded data.
+    """
+    queries = (line for line in lines if line.strip())
+    if workers > 1:
+        context = multiprocessing.get_context("fork")
+        with context.Pool(workers) as pool:
+            results = pool.imap(answer_with_mode, ((line, mode) for line in queries),
+                                chunksize=16)
+            for result in results:
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+    else:
+        for line in queries:
+            out.write(json.dumps(answer_query(line, mode)) + "\n")
+            out.flush()
+
+
+def answer_with_mode(arguments):
+    """
+    Pool entry point unpacking (line, mode) for answer_query.
+    """
+    return answer_query(*arguments)
+
+
+def degrees_estimate(source, target):
+    """
+    Returns (lower, upper) bounds on the degrees of separation between
+    two people from the landmark index, in constant time.
+    """
+    if landmark_index is None:
+        raise ValueError("degrees_estimate needs load_landmarks first")
+    return landmark_index.bounds(source, target)
+
+
+def movie_count(person_id):
+    """
+    Returns the number of movies a person starred in.
+    """
+    if graph is not None:
+        return len(graph.movies_of(graph.person_index[person_id]))
+    return len(people[person_id]["movies"])
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
+
+    With the co-star index enabled, each co-star appears once and
+    the person themselves is left out.
     """
+    if graph is not None:
+        return graph.neighbors_for_person(person_id)
+
+    if costars is not None:
+        neighbors = costars.get(person_id)
+        if neighbors is None:
+            neighbors = costars[person_id] = costars_for_person(person_id)
+        return neighbors
+
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -182,6 +492,10 @@ def neighbors_for_person(person_id):
     return neighbors
 
 
+# Single-source BFS trees for hub actors that are queried repeatedly
+tree_cache = TreeCache(lambda person_id: neighbors_for_person(person_id))
+
+
 if __name__ == "__main__":
     main()
 
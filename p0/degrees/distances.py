@@ -0,0 +1,122 @@
+import sys
+from collections import OrderedDict, deque
+
+# Rough cost of one dictionary entry plus its (movie_id, person_id) tuple
+ENTRY_BYTES = 160
+
+
+class BFSTree():
+    """
+    Breadth-first tree from one source person to everyone reachable.
+    """
+
+    def __init__(self, source, neighbors):
+        self.source = source
+
+        # Maps each reached person to the (movie_id, person_id) it was reached from
+        self.parents = {source: None}
+        frontier = deque([source])
+        while frontier:
+            person_id = frontier.popleft()
+            for movie_id, neighbor in neighbors(person_id):
+                if neighbor not in self.parents:
+                    self.parents[neighbor] = (movie_id, person_id)
+                    frontier.append(neighbor)
+
+    def path_to(self, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target.
+
+        If no possible path, returns None.
+        """
+        if target not in self.parents:
+            return None
+        connections = []
+        while self.parents[target] is not None:
+            movie_id, parent = self.parents[target]
+            connections.append((movie_id, target))
+            target = parent
+        connections.reverse()
+        return connections
+
+    def path_from(self, person_id):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect `person_id` to the source.
+
+        If no possible path, returns None.
+        """
+        if person_id not in self.parents:
+            return None
+        connections = []
+        while self.parents[person_id] is not None:
+            movie_id, person_id = self.parents[person_id]
+            connections.append((movie_id, person_id))
+        return connections
+
+    def distance_to(self, target):
+        """
+        Returns the degrees of separation from the source to the target,
+        or None if they are not connected.
+        """
+        path = self.path_to(target)
+        return None if path is None else len(path)
+
+    def nbytes(self):
+        """
+        Returns an estimate of the memory held by the tree.
+        """
+        return sys.getsizeof(self.parents) + ENTRY_BYTES * len(self.parents)
+
+
+class TreeCache():
+    """
+    Least-recently-used cache of BFS trees, bounded by estimated memory.
+    """
+
+    def __init__(self, neighbors, max_bytes=256 * 1024 * 1024):
+        self.neighbors = neighbors
+        self.max_bytes = max_bytes
+        self.trees = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self.trees.clear()
+        self.nbytes = 0
+
+    def tree(self, source):
+        """
+        Returns the BFS tree for `source`, building and caching it if needed.
+        """
+        if source in self.trees:
+            self.hits += 1
+            self.trees.move_to_end(source)
+            return self.trees[source]
+
+        self.misses += 1
+        tree = BFSTree(source, self.neighbors)
+        self.trees[source] = tree
+        self.nbytes += tree.nbytes()
+
+        # Evict least recently used trees, but always keep the newest one
+        while self.nbytes > self.max_bytes and len(self.trees) > 1:
+            _, evicted = self.trees.popitem(last=False)
+            self.nbytes -= evicted.nbytes()
+        return tree
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target, answered from a cached
+        tree rooted at either end when there is one.
+
+        If no possible path, returns None.
+        """
+        if source not in self.trees and target in self.trees:
+            self.hits += 1
+            self.trees.move_to_end(target)
+            return self.trees[target].path_from(source)
+        return self.tree(source).path_to(target)
@@ -0,0 +1,315 @@
+from array import array
+from collections import deque
+
+
+class CompactGraph():
+    """
+    People/movies graph with IDs interned to dense integers.
+
+    Adjacency is kept in CSR form: the movies of person `p` are
+    `person_movies[person_offsets[p]:person_offsets[p + 1]]`, and the
+    stars of movie `m` are `movie_stars[movie_offsets[m]:movie_offsets[m + 1]]`.
+    """
+
+    def __init__(self, person_ids, movie_ids,
+                 person_offsets, person_movies, movie_offsets, movie_stars,
+                 person_index=None, movie_index=None):
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        if person_index is None:
+            person_index = {
+                person_id: i for i, person_id in enumerate(person_ids)
+            }
+        if movie_index is None:
+            movie_index = {
+                movie_id: i for i, movie_id in enumerate(movie_ids)
+            }
+        self.person_index = person_index
+        self.movie_index = movie_index
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+
+        # Deduplicated co-star adjacency, filled by build_costars
+        self.costar_offsets = None
+        self.costar_people = None
+        self.costar_movies = None
+
+    @classmethod
+    def build(cls, person_ids, movie_ids, stars):
+        """
+        Builds a graph from lists of person and movie IDs and an
+        iterable of (person_id, movie_id) pairs.
+
+        Pairs naming an unknown person or movie are skipped.
+        """
+        person_ids = list(person_ids)
+        movie_ids = list(movie_ids)
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+
+        # Intern every star pair, dropping duplicates and unknown IDs
+        edges = set()
+        for person_id, movie_id in stars:
+            p = person_index.get(person_id)
+            m = movie_index.get(movie_id)
+            if p is not None and m is not None:
+                edges.add((p, m))
+        edge_people = array("i", (p for p, m in edges))
+        edge_movies = array("i", (m for p, m in edges))
+        del edges
+
+        person_offsets, person_movies = to_csr(
+            len(person_ids), edge_people, edge_movies
+        )
+        movie_offsets, movie_stars = to_csr(
+            len(movie_ids), edge_movies, edge_people
+        )
+        return cls(person_ids, movie_ids,
+                   person_offsets, person_movies, movie_offsets, movie_stars)
+
+    def movies_of(self, p):
+        """
+        Returns the movie indices person index `p` starred in.
+        """
+        return self.person_movies[self.person_offsets[p]:self.person_offsets[p + 1]]
+
+    def stars_of(self, m):
+        """
+        Returns the person indices starring in movie index `m`.
+        """
+        return self.movie_stars[self.movie_offsets[m]:self.movie_offsets[m + 1]]
+
+    def build_costars(self):
+        """
+        Precomputes, for every person, each distinct co-star once
+        together with one movie they share, in CSR form.
+        """
+        offsets = array("i", [0]) * (len(self.person_ids) + 1)
+        costar_people = array("i")
+        costar_movies = array("i")
+        for p in range(len(self.person_ids)):
+            shared = {}
+            for m, q in self.star_pairs(p):
+                if q != p and q not in shared:
+                    shared[q] = m
+            costar_people.extend(shared.keys())
+            costar_movies.extend(shared.values())
+            offsets[p + 1] = len(costar_people)
+        self.costar_offsets = offsets
+        self.costar_people = costar_people
+        self.costar_movies = costar_movies
+
+    def neighbors(self, p):
+        """
+        Yields (movie index, person index) pairs for people
+        who starred with person index `p`.
+        """
+        if self.costar_offsets is not None:
+            costar_people = self.costar_people
+            costar_movies = self.costar_movies
+            for k in range(self.costar_offsets[p], self.costar_offsets[p + 1]):
+                yield costar_movies[k], costar_people[k]
+            return
+        yield from self.star_pairs(p)
+
+    def star_pairs(self, p):
+        """
+        Yields a (movie index, person index) pair for every star of
+        every movie person index `p` starred in, themselves included.
+        """
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+        for k in range(person_offsets[p], person_offsets[p + 1]):
+            m = person_movies[k]
+            for s in range(movie_offsets[m], movie_offsets[m + 1]):
+                yield m, movie_stars[s]
+
+    def neighbors_for_person(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people
+        who starred with a given person.
+        """
+        return {
+            (self.movie_ids[m], self.person_ids[p])
+            for m, p in self.neighbors(self.person_index[person_id])
+        }
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target, searching breadth-first
+        over integer indices.
+
+        If no possible path, returns None.
+        """
+        start = self.person_index[source]
+        goal = self.person_index[target]
+        if start == goal:
+            return []
+
+        # Parent person and connecting movie for each reached person
+        count = len(self.person_ids)
+        parent_person = array("i", [-1]) * count
+        parent_movie = array("i", [-1]) * count
+        reached = bytearray(count)
+        reached[start] = 1
+
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+
+        frontier = deque([start])
+
+        if self.costar_offsets is not None:
+            costar_offsets = self.costar_offsets
+            costar_people = self.costar_people
+            costar_movies = self.costar_movies
+            while frontier:
+                p = frontier.popleft()
+                for k in range(costar_offsets[p], costar_offsets[p + 1]):
+                    q = costar_people[k]
+                    if reached[q]:
+                        continue
+                    reached[q] = 1
+                    parent_person[q] = p
+                    parent_movie[q] = costar_movies[k]
+                    if q == goal:
+                        return self.trace(parent_person, parent_movie, goal)
+                    frontier.append(q)
+            return None
+
+        while frontier:
+            p = frontier.popleft()
+            for k in range(person_offsets[p], person_offsets[p + 1]):
+                m = person_movies[k]
+                for s in range(movie_offsets[m], movie_offsets[m + 1]):
+                    q = movie_stars[s]
+                    if reached[q]:
+                        continue
+                    reached[q] = 1
+                    parent_person[q] = p
+                    parent_movie[q] = m
+                    if q == goal:
+                        return self.trace(parent_person, parent_movie, goal)
+                    frontier.append(q)
+        return None
+
+    def bidirectional_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target, expanding breadth-first
+        from both ends over integer indices and meeting in the middle.
+
+        If no possible path, returns None.
+        """
+        start = self.person_index[source]
+        goal = self.person_index[target]
+        if start == goal:
+            return []
+
+        # Per side: parent person, connecting movie and distance (-1 if
+        # not reached yet) for each person index
+        count = len(self.person_ids)
+        parents_source = array("i", [-1]) * count
+        movies_source = array("i", [-1]) * count
+        depth_source = array("i", [-1]) * count
+        parents_target = array("i", [-1]) * count
+        movies_target = array("i", [-1]) * count
+        depth_target = array("i", [-1]) * count
+        depth_source[start] = 0
+        depth_target[goal] = 0
+        frontier_source = [start]
+        frontier_target = [goal]
+
+        while frontier_source and frontier_target:
+
+            # Expand whichever side has the smaller frontier, one full layer
+            if len(frontier_source) <= len(frontier_target):
+                frontier_source, meeting = self.expand_layer(
+                    frontier_source, parents_source, movies_source,
+                    depth_source, depth_target
+                )
+            else:
+                frontier_target, meeting = self.expand_layer(
+                    frontier_target, parents_target, movies_target,
+                    depth_target, depth_source
+                )
+
+            if meeting is not None:
+                connections = self.trace(parents_source, movies_source, meeting)
+                p = meeting
+                while parents_target[p] != -1:
+                    connections.append((self.movie_ids[movies_target[p]],
+                                        self.person_ids[parents_target[p]]))
+                    p = parents_target[p]
+                return connections
+
+        return None
+
+    def expand_layer(self, frontier, parent_person, parent_movie,
+                     depth, other_depth):
+        """
+        Expands every person index in `frontier` by one step.
+
+        Returns the next frontier and the best person index reached by
+        both sides, or None if the two searches have not met yet.
+        """
+        next_frontier = []
+        meeting = None
+        best = None
+        for p in frontier:
+            d = depth[p] + 1
+            for m, q in self.neighbors(p):
+                if depth[q] != -1:
+                    continue
+                parent_person[q] = p
+                parent_movie[q] = m
+                depth[q] = d
+                next_frontier.append(q)
+
+                # Keep the meeting point with the shortest total length
+                if other_depth[q] != -1:
+                    total = d + other_depth[q]
+                    if best is None or total < best:
+                        best = total
+                        meeting = q
+        return next_frontier, meeting
+
+    def trace(self, parent_person, parent_movie, p):
+        """
+        Follows parent pointers back from person index `p` and returns
+        the path as a list of (movie_id, person_id) pairs.
+        """
+        connections = []
+        while parent_person[p] != -1:
+            connections.append((self.movie_ids[parent_movie[p]],
+                                self.person_ids[p]))
+            p = parent_person[p]
+        connections.reverse()
+        return connections
+
+
+def to_csr(size, rows, columns):
+    """
+    Groups `columns` by `rows` (both arrays of equal length) into
+    compressed sparse row form over `size` rows.
+
+    Returns the offsets array and the grouped column array.
+    """
+    offsets = array("i", [0]) * (size + 1)
+    for row in rows:
+        offsets[row + 1] += 1
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+
+    cursor = array("i", offsets)
+    grouped = array("i", [0]) * len(rows)
+    for row, column in zip(rows, columns):
+        grouped[cursor[row]] = column
+        cursor[row] += 1
+    return offsets, grouped
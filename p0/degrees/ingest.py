@@ -0,0 +1,168 @@
+import csv
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Rows parsed between progress reports
+CHUNK_SIZE = 10000
+
+
+class Progress():
+    """
+    Tracks rows parsed, throughput and memory growth while loading.
+    """
+
+    def __init__(self, out=sys.stderr):
+        self.out = out
+        self.start = time.time()
+        self.start_memory = peak_memory()
+        self.rows = {}
+
+    def update(self, name, rows):
+        """
+        Records `rows` more rows parsed from file `name` and reports
+        the running totals.
+        """
+        self.rows[name] = self.rows.get(name, 0) + rows
+        if self.out is not None:
+            print(f"{name}: {self.rows[name]:,} rows, {self.summary()}",
+                  file=self.out)
+
+    def summary(self):
+        """
+        Returns overall throughput and memory growth as a string.
+        """
+        elapsed = max(time.time() - self.start, 1e-9)
+        rate = sum(self.rows.values()) / elapsed
+        growth = self.memory_growth()
+        memory = "n/a" if growth is None else f"+{growth / 2 ** 20:.1f} MB"
+        return f"{rate:,.0f} rows/s, {memory}"
+
+    def memory_growth(self):
+        """
+        Returns how much the peak resident memory grew since loading
+        started, in bytes, or None where it cannot be measured.
+        """
+        if self.start_memory is None:
+            return None
+        return peak_memory() - self.start_memory
+
+
+def peak_memory():
+    """
+    Returns the peak resident memory of this process in bytes,
+    or None where it cannot be measured.
+    """
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+def read_rows(path, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Yields the rows of a CSV file as dictionaries, one at a time,
+    reporting to `progress` after every `chunk_size` rows.
+    """
+    name = path.rsplit("/", 1)[-1]
+    with open(path, encoding="utf-8") as f:
+        count = 0
+        for row in csv.DictReader(f):
+            yield row
+            count += 1
+            if count == chunk_size:
+                if progress is not None:
+                    progress.update(name, count)
+                count = 0
+        if count and progress is not None:
+            progress.update(name, count)
+
+
+def ingest(directory, add_person, add_movie, add_star, year_range=None,
+           chunk_size=CHUNK_SIZE, parallel=False, progress=None):
+    """
+    Streams the three CSV files of a dataset through the given callbacks.
+
+    `add_person(row)` and `add_movie(row)` receive rows of people.csv
+    and movies.csv; `add_star(person_id, movie_id)` is called for rows
+    of stars.csv once every person and movie has been added. With
+    `add_star` None, stars are left for the caller to stream with
+    star_pairs.
+
+    With `year_range` = (first, last), only movies released in those years
+    are kept, along with the stars and people that appear in them.
+    stars.csv is then read twice, first to find the people to keep, so
+    that no star pairs are held in memory.
+    With `parallel`, people.csv and movies.csv are read at once in separate
+    threads. Loads with a `year_range` read the files in turn, since the
+    stars kept depend on the movies and the people kept on the stars.
+    """
+    def read(name, add):
+        for row in read_rows(f"{directory}/{name}", chunk_size, progress):
+            add(row)
+
+    if year_range is None:
+
+        # Stars refer to people and movies, so those are loaded first
+        if parallel:
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                futures = [pool.submit(read, "people.csv", add_person),
+                           pool.submit(read, "movies.csv", add_movie)]
+                for future in futures:
+                    future.result()
+        else:
+            read("people.csv", add_person)
+            read("movies.csv", add_movie)
+        if add_star is not None:
+            for person_id, movie_id in star_pairs(directory, None, chunk_size, progress):
+                add_star(person_id, movie_id)
+        return
+
+    # Movies decide which stars are kept, and stars which people are kept
+    kept = set()
+
+    def keep_movie(row):
+        if in_range(row["year"], year_range):
+            add_movie(row)
+            kept.add(row["id"])
+
+    read("movies.csv", keep_movie)
+    starring = {person_id for person_id, _ in
+                star_pairs(directory, kept, chunk_size, progress)}
+
+    def keep_person(row):
+        if row["id"] in starring:
+            add_person(row)
+
+    read("people.csv", keep_person)
+    if add_star is not None:
+        for person_id, movie_id in star_pairs(directory, kept, chunk_size, progress):
+            add_star(person_id, movie_id)
+
+
+def star_pairs(directory, movie_ids=None, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Yields (person_id, movie_id) for each row of stars.csv, keeping only
+    movies in `movie_ids` unless it is None.
+    """
+    for row in read_rows(f"{directory}/stars.csv", chunk_size, progress):
+        if movie_ids is None or row["movie_id"] in movie_ids:
+            yield row["person_id"], row["movie_id"]
+
+
+def in_range(year, year_range):
+    """
+    Returns True if the `year` string falls within (first, last).
+    """
+    try:
+        year = int(year)
+    except ValueError:
+        return False
+    first, last = year_range
+    return first <= year <= last
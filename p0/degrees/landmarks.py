@@ -0,0 +1,154 @@
+import os
+import pickle
+from array import array
+from collections import deque
+
+from search import bidirectional_search
+from snapshot import source_signature
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = -1
+
+
+class LandmarkIndex():
+    """
+    Distances from a few high-degree landmark actors to everyone,
+    giving constant-time bounds on the degrees of separation of any pair.
+    """
+
+    def __init__(self, person_ids, landmarks, distances):
+        self.person_ids = person_ids
+        self.position = {person_id: i for i, person_id in enumerate(person_ids)}
+        self.landmarks = landmarks
+
+        # One array per landmark, indexed by position in person_ids
+        self.distances = distances
+
+    @classmethod
+    def build(cls, person_ids, neighbors, degree, k=8):
+        """
+        Picks the `k` people with the highest `degree` as landmarks and
+        runs a breadth-first search from each of them.
+        """
+        person_ids = list(person_ids)
+        landmarks = sorted(person_ids, key=degree, reverse=True)[:k]
+        position = {person_id: i for i, person_id in enumerate(person_ids)}
+
+        distances = []
+        for landmark in landmarks:
+            distance = array("h", [UNREACHABLE]) * len(person_ids)
+            distance[position[landmark]] = 0
+            frontier = deque([landmark])
+            while frontier:
+                person_id = frontier.popleft()
+                d = distance[position[person_id]] + 1
+                for _, neighbor in neighbors(person_id):
+                    if distance[position[neighbor]] == UNREACHABLE:
+                        distance[position[neighbor]] = d
+                        frontier.append(neighbor)
+            distances.append(distance)
+        return cls(person_ids, landmarks, distances)
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the degrees of separation
+        between source and target.
+
+        `upper` is None if no landmark reaches both; `lower` is None if
+        some landmark proves the two are not connected.
+        """
+        if source == target:
+            return 0, 0
+        s = self.position[source]
+        t = self.position[target]
+        lower = 1
+        upper = None
+        for distance in self.distances:
+            ds = distance[s]
+            dt = distance[t]
+
+            # A landmark reaching exactly one of them separates them
+            if (ds == UNREACHABLE) != (dt == UNREACHABLE):
+                return None, None
+            if ds == UNREACHABLE:
+                continue
+
+            # Triangle inequality through the landmark
+            lower = max(lower, abs(ds - dt))
+            if upper is None or ds + dt < upper:
+                upper = ds + dt
+        return lower, upper
+
+    def lower_bound(self, source, target):
+        """
+        Returns a lower bound on the degrees of separation, or None
+        if the two are known not to be connected.
+        """
+        return self.bounds(source, target)[0]
+
+    def save(self, directory, year_range=None):
+        """
+        Writes the index next to the dataset, tagged with the CSV signature
+        and the year range the data was loaded with.
+        """
+        path = index_path(directory)
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as f:
+            pickle.dump(
+                ((source_signature(directory), year_range),
+                 self.person_ids, self.landmarks,
+                 [distance.tobytes() for distance in self.distances]),
+                f, protocol=pickle.HIGHEST_PROTOCOL
+            )
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, directory, year_range=None):
+        """
+        Reads a saved index, or returns None if there is none, it is
+        out of date with the CSV files or it was built over another
+        year range.
+        """
+        try:
+            with open(index_path(directory), "rb") as f:
+                signature, person_ids, landmarks, blobs = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        if signature != (source_signature(directory), year_range):
+            return None
+        distances = []
+        for blob in blobs:
+            distance = array("h")
+            distance.frombytes(blob)
+            distances.append(distance)
+        return cls(person_ids, landmarks, distances)
+
+
+def index_path(directory):
+    """
+    Returns the path of the landmark index kept next to the CSV files.
+    """
+    return os.path.join(directory, "degrees.landmarks")
+
+
+def alt_search(source, target, neighbors, index):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs that
+    connect the source to the target, using a bidirectional
+    breadth-first search that skips people whose landmark lower bound
+    shows they cannot lie on a path shorter than the landmark upper bound.
+
+    If no possible path, returns None.
+    """
+    lower, upper = index.bounds(source, target)
+    if lower is None:
+        return None
+    if upper is None:
+        return bidirectional_search(source, target, neighbors)
+
+    # Prune people who cannot be on a path within the upper bound
+    def prune(person_id, distance, end):
+        remaining = index.lower_bound(person_id, end)
+        return remaining is None or distance + remaining > upper
+
+    return bidirectional_search(source, target, neighbors, prune)
@@ -0,0 +1,103 @@
+def bidirectional_search(source, target, neighbors, prune=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, found by expanding
+    breadth-first from both ends and meeting in the middle.
+
+    `neighbors(person_id)` yields (movie_id, person_id) pairs. With
+    `prune(person_id, distance, end)`, people it returns True for are
+    skipped, where `distance` is how far they are from the side being
+    expanded and `end` is the person at the other end of the search.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    # Each side maps a reached person to (movie_id, person_id) of the
+    # neighbour it was reached from, and to its distance from that side
+    parents_source = {source: None}
+    parents_target = {target: None}
+    depth_source = {source: 0}
+    depth_target = {target: 0}
+    frontier_source = [source]
+    frontier_target = [target]
+
+    prune_source = prune_target = None
+    if prune is not None:
+        prune_source = lambda person_id, distance: prune(person_id, distance, target)
+        prune_target = lambda person_id, distance: prune(person_id, distance, source)
+
+    while frontier_source and frontier_target:
+
+        # Expand whichever side has the smaller frontier, one full layer
+        if len(frontier_source) <= len(frontier_target):
+            frontier_source, meeting = expand_layer(
+                frontier_source, parents_source, depth_source, depth_target,
+                neighbors, prune_source
+            )
+        else:
+            frontier_target, meeting = expand_layer(
+                frontier_target, parents_target, depth_target, depth_source,
+                neighbors, prune_target
+            )
+
+        if meeting is not None:
+            return join_paths(meeting, parents_source, parents_target)
+
+    return None
+
+
+def expand_layer(frontier, parents, depth, other_depth, neighbors, prune=None):
+    """
+    Expands every person in `frontier` by one step, skipping people
+    not yet reached by the other side for whom `prune(person_id, distance)`
+    returns True.
+
+    Returns the next frontier and the best person reached by both
+    sides, or None if the two searches have not met yet.
+    """
+    next_frontier = []
+    meeting = None
+    best = None
+    for person_id in frontier:
+        distance = depth[person_id] + 1
+        for movie_id, neighbor in neighbors(person_id):
+            if neighbor in depth:
+                continue
+            if (prune is not None and neighbor not in other_depth
+                    and prune(neighbor, distance)):
+                continue
+            parents[neighbor] = (movie_id, person_id)
+            depth[neighbor] = distance
+            next_frontier.append(neighbor)
+
+            # Keep the meeting point with the shortest total length
+            if neighbor in other_depth:
+                total = distance + other_depth[neighbor]
+                if best is None or total < best:
+                    best = total
+                    meeting = neighbor
+    return next_frontier, meeting
+
+
+def join_paths(meeting, parents_source, parents_target):
+    """
+    Joins the source half and the target half of a bidirectional
+    search at `meeting` into a list of (movie_id, person_id) pairs.
+    """
+    # Walk back from the meeting point to the source
+    connections = []
+    person_id = meeting
+    while parents_source[person_id] is not None:
+        movie_id, parent = parents_source[person_id]
+        connections.append((movie_id, person_id))
+        person_id = parent
+    connections.reverse()
+
+    # Walk forward from the meeting point to the target
+    person_id = meeting
+    while parents_target[person_id] is not None:
+        movie_id, person_id = parents_target[person_id]
+        connections.append((movie_id, person_id))
+    return connections
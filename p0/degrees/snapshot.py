@@ -0,0 +1,171 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from graph import CompactGraph
+
+MAGIC = b"DEGSNAP2"
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+ARRAYS = ("person_offsets", "person_movies", "movie_offsets", "movie_stars")
+
+# Fields of each person and movie, stored as NUL-separated UTF-8 strings
+PERSON_FIELDS = ("name", "birth")
+MOVIE_FIELDS = ("title", "year")
+
+
+def snapshot_path(directory):
+    """
+    Returns the path of the snapshot file kept next to the CSV files.
+    """
+    return os.path.join(directory, "degrees.snapshot")
+
+
+def source_signature(directory):
+    """
+    Returns the modification time and size of each CSV file,
+    used to tell whether a snapshot is still up to date.
+    """
+    signature = {}
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        signature[name] = [stat.st_mtime_ns, stat.st_size]
+    return signature
+
+
+def save_snapshot(directory, graph, names, people, movies):
+    """
+    Writes the graph arrays and the people/movies metadata to a binary
+    snapshot. `names` is rebuilt from the people when loading.
+
+    Layout: magic, 8-byte header length, JSON header, then each array's
+    raw bytes aligned to 8 bytes, then the person IDs and each person
+    field, and the movie IDs and each movie field, as strings joined by NUL.
+    """
+    blobs = [getattr(graph, name).tobytes() for name in ARRAYS]
+    blobs.append(join_strings(graph.person_ids))
+    for field in PERSON_FIELDS:
+        blobs.append(join_strings(people[person_id][field]
+                                  for person_id in graph.person_ids))
+    blobs.append(join_strings(graph.movie_ids))
+    for field in MOVIE_FIELDS:
+        blobs.append(join_strings(movies[movie_id][field]
+                                  for movie_id in graph.movie_ids))
+
+    # Work out where each blob will sit; the header length is fixed
+    # by padding so the offsets can be computed before it is written
+    header = {
+        "sources": source_signature(directory),
+        "itemsize": graph.person_offsets.itemsize,
+        "byteorder": sys.byteorder,
+        "blobs": []
+    }
+    header_size = 4096
+    offset = len(MAGIC) + 8 + header_size
+    for blob in blobs:
+        offset += -offset % 8
+        header["blobs"].append([offset, len(blob)])
+        offset += len(blob)
+    encoded = json.dumps(header).encode("utf-8")
+    if len(encoded) > header_size:
+        raise ValueError("snapshot header too large")
+
+    # Write to a temporary file first so a crash never leaves a torn snapshot
+    path = snapshot_path(directory)
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", header_size))
+        f.write(encoded.ljust(header_size, b" "))
+        for (offset, _), blob in zip(header["blobs"], blobs):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(blob)
+    os.replace(temporary, path)
+
+
+def load_snapshot(directory):
+    """
+    Maps a snapshot into memory.
+
+    Returns (graph, names, people, movies), or None if there is no
+    snapshot, it is out of date with the CSV files, or it is truncated
+    or corrupt.
+    """
+    path = snapshot_path(directory)
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    try:
+        with f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            header_size, = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(header_size))
+            if (header["sources"] != source_signature(directory)
+                    or header["byteorder"] != sys.byteorder
+                    or header["itemsize"] != array("i").itemsize):
+                return None
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return read_snapshot(buffer, header["blobs"])
+    except (struct.error, ValueError, EOFError, KeyError, TypeError):
+        return None
+
+
+def read_snapshot(buffer, blobs):
+    """
+    Returns (graph, names, people, movies) from a mapped snapshot and
+    the (offset, length) of each of its blobs.
+    """
+    if len(blobs) != len(ARRAYS) + 2 + len(PERSON_FIELDS) + len(MOVIE_FIELDS):
+        raise ValueError("snapshot has the wrong number of blobs")
+    if any(offset + length > len(buffer) for offset, length in blobs):
+        raise ValueError("snapshot is truncated")
+
+    # Arrays are used in place; only the strings are decoded
+    view = memoryview(buffer)
+    arrays = {}
+    for name, (offset, length) in zip(ARRAYS, blobs):
+        arrays[name] = view[offset:offset + length].cast("i")
+    strings = [split_strings(view[offset:offset + length])
+               for offset, length in blobs[len(ARRAYS):]]
+
+    person_ids = strings[0]
+    person_fields = strings[1:1 + len(PERSON_FIELDS)]
+    movie_ids = strings[1 + len(PERSON_FIELDS)]
+    movie_fields = strings[2 + len(PERSON_FIELDS):]
+    if any(len(values) != len(person_ids) for values in person_fields) or any(
+        len(values) != len(movie_ids) for values in movie_fields
+    ):
+        raise ValueError("snapshot tables differ in length")
+
+    people = {
+        person_id: dict(zip(PERSON_FIELDS, values))
+        for person_id, *values in zip(person_ids, *person_fields)
+    }
+    movies = {
+        movie_id: dict(zip(MOVIE_FIELDS, values))
+        for movie_id, *values in zip(movie_ids, *movie_fields)
+    }
+    names = {}
+    for person_id, name in zip(person_ids, person_fields[0]):
+        names.setdefault(name.lower(), set()).add(person_id)
+
+    graph = CompactGraph(person_ids, movie_ids, **arrays)
+    return graph, names, people, movies
+
+
+def join_strings(strings):
+    """
+    Returns the strings as UTF-8 bytes separated by NUL.
+    """
+    return "\0".join(strings).encode("utf-8")
+
+
+def split_strings(data):
+    """
+    Returns the list of strings from join_strings.
+    """
+    return bytes(data).decode("utf-8").split("\0")
@@ -0,0 +1,199 @@
+"""
+Compact Tic Tac Toe boards: one integer for the cells held by X and one
+for the cells held by O, with cell (i, j) at bit i * cols + j.
+"""
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Boards with at most this many cells get precomputed symmetry tables
+TABLE_LIMIT = 12
+
+
+class Geometry():
+    """
+    Board of `rows` x `cols` cells where `k` in a row wins, with the
+    masks and orderings the search needs precomputed.
+    """
+
+    def __init__(self, rows=3, cols=3, k=3):
+        if not 1 <= k <= max(rows, cols):
+            raise ValueError("win length must fit on the board")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.size = rows * cols
+        self.full = (1 << self.size) - 1
+        self.key = (rows, cols, k)
+
+        # Every run of k cells along a row, column or diagonal
+        self.win_masks = []
+        for i in range(rows):
+            for j in range(cols):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_i = i + di * (k - 1)
+                    end_j = j + dj * (k - 1)
+                    if 0 <= end_i < rows and 0 <= end_j < cols:
+                        mask = 0
+                        for step in range(k):
+                            mask |= self.bit(i + di * step, j + dj * step)
+                        self.win_masks.append(mask)
+
+        # Masks through each cell, used to check only lines a move touches
+        self.masks_through = [
+            [mask for mask in self.win_masks if mask >> index & 1]
+            for index in range(self.size)
+        ]
+
+        # Cells on the most winning lines first, then nearest the center
+        center_i = (rows - 1) / 2
+        center_j = (cols - 1) / 2
+        self.order = sorted(range(self.size), key=lambda index: (
+            -len(self.masks_through[index]),
+            abs(index // cols - center_i) + abs(index % cols - center_j),
+            index
+        ))
+
+        # Cells under each rotation and reflection that maps the board onto itself
+        self.symmetries = []
+        transforms = [
+            lambda i, j: (i, j),
+            lambda i, j: (i, cols - 1 - j),
+            lambda i, j: (rows - 1 - i, j),
+            lambda i, j: (rows - 1 - i, cols - 1 - j),
+        ]
+        if rows == cols:
+            transforms += [
+                lambda i, j: (j, i),
+                lambda i, j: (j, rows - 1 - i),
+                lambda i, j: (cols - 1 - j, i),
+                lambda i, j: (cols - 1 - j, rows - 1 - i),
+            ]
+        for transform in transforms:
+            self.symmetries.append([
+                transform(index // cols, index % cols)[0] * cols
+                + transform(index // cols, index % cols)[1]
+                for index in range(self.size)
+            ])
+        self.permutations = None
+        if self.size <= TABLE_LIMIT:
+            self.permutations = [
+                [self.permute(mask, symmetry) for mask in range(self.full + 1)]
+                for symmetry in self.symmetries
+            ]
+
+    def bit(self, i, j):
+        """
+        Returns the bit for cell (i, j).
+        """
+        return 1 << (i * self.cols + j)
+
+    def permute(self, mask, symmetry):
+        """
+        Returns the image of `mask` when cell `index` moves to `symmetry[index]`.
+        """
+        image = 0
+        for index, target in enumerate(symmetry):
+            if mask >> index & 1:
+                image |= 1 << target
+        return image
+
+    def wins(self, bits):
+        """
+        Returns True if the cells in `bits` complete a line of k.
+        """
+        for mask in self.win_masks:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def wins_through(self, bits, index):
+        """
+        Returns True if the cells in `bits` complete a line of k
+        through cell `index`.
+        """
+        for mask in self.masks_through[index]:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def canonical(self, x, o):
+        """
+        Returns an integer key that is the same for the position and all
+        of its rotations and reflections.
+        """
+        if self.permutations is not None:
+            return min(table[x] << self.size | table[o]
+                       for table in self.permutations)
+        return min(self.permute(x, symmetry) << self.size | self.permute(o, symmetry)
+                   for symmetry in self.symmetries)
+
+    def decode(self, x, o):
+        """
+        Returns the list-of-lists board for the (x, o) bitboards.
+        """
+        board = []
+        for i in range(self.rows):
+            row = []
+            for j in range(self.cols):
+                cell = self.bit(i, j)
+                row.append(X if x & cell else O if o & cell else EMPTY)
+            board.append(row)
+        return board
+
+    def to_action(self, index):
+        """
+        Returns the (i, j) action for a cell index.
+        """
+        return divmod(index, self.cols)
+
+
+# Geometries already built, keyed by (rows, cols, k)
+geometries = {}
+
+
+def geometry(rows=3, cols=3, k=3):
+    """
+    Returns the shared Geometry for a board size and win length.
+    """
+    key = (rows, cols, k)
+    if key not in geometries:
+        geometries[key] = Geometry(rows, cols, k)
+    return geometries[key]
+
+
+def encode(board):
+    """
+    Returns the (x, o) bitboards of a list-of-lists board.
+    """
+    x = o = 0
+    cols = len(board[0])
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == X:
+                x |= 1 << (i * cols + j)
+            elif cell == O:
+                o |= 1 << (i * cols + j)
+    return x, o
+
+
+def decode(x, o, rows=3, cols=3):
+    """
+    Returns the list-of-lists board for the (x, o) bitboards.
+    """
+    return geometry(rows, cols, min(rows, cols)).decode(x, o)
+
+
+def count_cells(bits):
+    """
+    Returns how many cells are set in bitboard `bits`.
+    """
+    return bin(bits).count("1")
+
+
+def x_to_move(x, o):
+    """
+    Returns True if X has the next turn.
+    """
+    return count_cells(x) == count_cells(o)
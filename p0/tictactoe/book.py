@@ -0,0 +1,123 @@
+"""
+Perfect-play opening book for 3x3 Tic Tac Toe.
+
+Every reachable position is solved once and stored in a flat table
+indexed by the base-3 number of the board (empty 0, X 1, O 2 per cell).
+Each entry packs the minimax value plus one in the top bits and a 9-bit
+mask of the optimal moves in the low bits.
+"""
+
+import os
+import sys
+from array import array
+
+import bitboard
+
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+MAGIC = b"TTTBOOK1"
+
+# Entry of a position that is unreachable, or already over
+MISSING = 0xFFFF
+
+# Powers of 3 for each cell index
+POWERS = [3 ** index for index in range(9)]
+
+
+def position(x, o):
+    """
+    Returns the base-3 table index of the (x, o) bitboards.
+    """
+    index = 0
+    for cell in range(9):
+        if x >> cell & 1:
+            index += POWERS[cell]
+        elif o >> cell & 1:
+            index += 2 * POWERS[cell]
+    return index
+
+
+class Book():
+    """
+    Table of solved 3x3 positions.
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+
+    def lookup(self, x, o):
+        """
+        Returns (value, moves) for the (x, o) bitboards, where moves lists
+        every optimal cell index, or None if the position is not in the book.
+        """
+        entry = self.entries[position(x, o)]
+        if entry == MISSING:
+            return None
+        moves = [index for index in range(9) if entry >> index & 1]
+        return (entry >> 9) - 1, moves
+
+    def save(self, path=BOOK_PATH):
+        """
+        Writes the table to disk.
+        """
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as f:
+            f.write(MAGIC)
+            f.write(self.entries.tobytes())
+        os.replace(temporary, path)
+
+
+def load(path=BOOK_PATH):
+    """
+    Reads a book from disk, or returns None if there is no valid one.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    entries = array("H")
+    if not data.startswith(MAGIC) or len(data) - len(MAGIC) != 2 * 3 ** 9:
+        return None
+    entries.frombytes(data[len(MAGIC):])
+    return Book(entries)
+
+
+def generate():
+    """
+    Solves every position reachable from the empty board and returns the book.
+    """
+    import tictactoe
+
+    geometry = bitboard.geometry(3, 3, 3)
+    entries = array("H", [MISSING]) * 3 ** 9
+    seen = set()
+    frontier = [(0, 0)]
+    while frontier:
+        x, o = frontier.pop()
+        if (x, o) in seen:
+            continue
+        seen.add((x, o))
+        if geometry.wins(x) or geometry.wins(o) or x | o == geometry.full:
+            continue
+
+        # Value every move and keep all of those that are optimal
+        x_turn = bitboard.x_to_move(x, o)
+        values = {}
+        for index in range(9):
+            if not (x | o) >> index & 1:
+                child = (x | 1 << index, o) if x_turn else (x, o | 1 << index)
+                values[index] = tictactoe.full_value(*child, geometry)
+                frontier.append(child)
+        best = max(values.values()) if x_turn else min(values.values())
+        mask = 0
+        for index, value in values.items():
+            if value == best:
+                mask |= 1 << index
+        entries[position(x, o)] = (best + 1) << 9 | mask
+    return Book(entries)
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else BOOK_PATH
+    generate().save(path)
+    print(f"Opening book written to {path}")
@@ -0,0 +1,148 @@
+"""
+Headless self-play benchmark for the Tic Tac Toe AI.
+
+Plays games AI-vs-AI or AI-vs-random without pygame, reports move
+latency, throughput and nodes searched, and exits with status 1 if the
+AI ever loses, so it can gate changes to the search.
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+
+import tictactoe as ttt
+
+VARIANTS = ("book", "alphabeta", "minimax", "deepening")
+
+
+def choose_move(board, variant, time_limit):
+    """
+    Returns the AI's move for the board using one search variant.
+    """
+    if variant == "minimax":
+        return ttt.minimax(board, pruning=False)
+    if variant == "deepening":
+        return ttt.minimax(board, time_limit=time_limit)
+    return ttt.minimax(board)
+
+
+def play_game(variant, opponent, ai_player, rng, time_limit):
+    """
+    Plays one game from the empty board.
+
+    Returns the winner (or None for a draw), and the latency in seconds
+    and nodes searched for each AI move.
+    """
+    board = ttt.initial_state()
+    latencies = []
+    nodes = []
+    while not ttt.terminal(board):
+        turn = ttt.player(board)
+        if opponent == "random" and turn != ai_player:
+            move = rng.choice(ttt.actions(board))
+        else:
+            start = time.perf_counter()
+            move = choose_move(board, variant, time_limit)
+            latencies.append(time.perf_counter() - start)
+            nodes.append(ttt.stats["nodes"])
+        board = ttt.result(board, move)
+    return ttt.winner(board), latencies, nodes
+
+
+def percentile(values, fraction):
+    """
+    Returns the nearest-rank percentile of `values`.
+    """
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def run(games, variant, opponent, seed=0, cold=False, time_limit=0.1):
+    """
+    Plays `games` games and returns a dictionary of results.
+
+    The transposition table starts empty, so variants run one after
+    another do not share a warm cache; with `cold`, it is also cleared
+    before every game. The opening book is only consulted by the "book" variant.
+    """
+    rng = random.Random(seed)
+    random.seed(seed)
+    saved_book = ttt.opening_book
+    if variant != "book":
+        ttt.opening_book = None
+    elif saved_book is None:
+        print("No opening book found; run book.py first. Searching instead.")
+
+    ttt.transpositions.clear()
+    outcomes = {"wins": 0, "draws": 0, "losses": 0}
+    latencies = []
+    nodes = []
+    start = time.perf_counter()
+    try:
+        for game in range(games):
+            if cold:
+                ttt.transpositions.clear()
+            ai_player = ttt.X if game % 2 == 0 else ttt.O
+            winner, game_latencies, game_nodes = play_game(
+                variant, opponent, ai_player, rng, time_limit
+            )
+            latencies.extend(game_latencies)
+            nodes.extend(game_nodes)
+
+            # Against itself the AI can only draw; against random it must not lose
+            if winner is None:
+                outcomes["draws"] += 1
+            elif opponent == "ai" or winner != ai_player:
+                outcomes["losses"] += 1
+            else:
+                outcomes["wins"] += 1
+    finally:
+        ttt.opening_book = saved_book
+    elapsed = time.perf_counter() - start
+
+    return {
+        "games": games,
+        "moves": len(latencies),
+        "moves_per_second": len(latencies) / elapsed if elapsed else float("inf"),
+        "nodes_per_move": sum(nodes) / len(nodes) if nodes else 0,
+        "p50": percentile(latencies, 0.50),
+        "p90": percentile(latencies, 0.90),
+        "p99": percentile(latencies, 0.99),
+        "max": max(latencies),
+        **outcomes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Tic Tac Toe AI by self-play.")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--opponent", choices=("ai", "random"), default="random")
+    parser.add_argument("--variants", nargs="+", choices=VARIANTS, default=list(VARIANTS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cold", action="store_true",
+                        help="clear the transposition table before every game")
+    parser.add_argument("--time-limit", type=float, default=0.1,
+                        help="seconds per move for the deepening variant")
+    args = parser.parse_args()
+
+    lost = False
+    for variant in args.variants:
+        results = run(args.games, variant, args.opponent, args.seed,
+                      args.cold, args.time_limit)
+        print(f"{variant:>10}: {results['moves_per_second']:10.1f} moves/s  "
+              f"{results['nodes_per_move']:9.1f} nodes/move  "
+              f"p50 {results['p50'] * 1000:7.3f} ms  p90 {results['p90'] * 1000:7.3f} ms  "
+              f"p99 {results['p99'] * 1000:7.3f} ms  max {results['max'] * 1000:7.3f} ms  "
+              f"W/D/L {results['wins']}/{results['draws']}/{results['losses']}")
+        if results["losses"]:
+            lost = True
+            print(f"FAIL {variant} lost {results['losses']} game(s)")
+    if lost:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
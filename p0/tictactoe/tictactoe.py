@@ -3,21 +3,105 @@ Tic Tac Toe Player
 """
 
 import math
-import copy
 import random
+import time
+from collections import OrderedDict
+
+import bitboard
+import book
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Number of boards visited by the most recent minimax call, and the
+# depth reached when it had to search with a time limit
+stats = {"nodes": 0, "depth": None}
+
+# Boards with more cells than this are searched to a limited depth
+EXACT_CELLS = 9
+
+# Seconds a depth-limited search may take when no time limit is given
+DEFAULT_TIME_LIMIT = 1.0
+
+# Score of a won board in depth-limited search, less one per move taken
+WIN_SCORE = 10 ** 6
+
+# Kinds of value stored in the transposition table
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
 
-def initial_state():
+class TranspositionTable():
+    """
+    Bounded cache of search results keyed on boards up to symmetry,
+    shared by every search in the process.
+    """
+
+    def __init__(self, max_size=100000):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        Returns the (value, kind) stored for key, or None.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, value, kind):
+        """
+        Stores a value for key, evicting the least recently used entry when full.
+        """
+        self.entries[key] = (value, kind)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+
+transpositions = TranspositionTable()
+
+# Solved 3x3 positions, if an opening book has been generated (see book.py)
+opening_book = book.load()
+
+
+class Timeout(Exception):
+    """
+    Raised when a depth-limited search runs past its deadline.
+    """
+
+
+def initial_state(rows=3, cols=3):
     """
     Returns starting state of the board.
     """
-    return [[EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY]]
+    return [[EMPTY] * cols for _ in range(rows)]
+
+
+def board_geometry(board, k=None):
+    """
+    Returns the bitboard Geometry for the board's size, where `k` in a
+    row wins (by default, a full row on the shorter side).
+    """
+    rows = len(board)
+    cols = len(board[0])
+    return bitboard.geometry(rows, cols, k or min(rows, cols))
 
 
 def player(board):
@@ -50,8 +134,8 @@ def actions(board):
     # set of possible actions
     actions_set = []
 
-    for i in range(3):  # rows in the board (0, 1, 2)
-        for j in range(3):  # boxs in rows (0, 1, 2)
+    for i in range(len(board)):  # rows in the board (0, 1, 2)
+        for j in range(len(board[i])):  # boxs in rows (0, 1, 2)
             if board[i][j] == EMPTY:
                 actions_set.append((i, j))
     return actions_set
@@ -61,64 +145,52 @@ def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
+    i, j = action
     # if not valid action
-    if action not in actions(board):
+    if not (0 <= i < len(board) and 0 <= j < len(board[0])) or board[i][j] != EMPTY:
         raise Exception("Invalid action!")
 
-    i, j = action
     turn = player(board)
-    # make deepcopy of board and let current player make their move
-    new_board = copy.deepcopy(board)
+    # copy the rows of the board and let current player make their move
+    new_board = [list(row) for row in board]
     new_board[i][j] = turn
 
     return new_board
 
 
-def winner(board):
+def winner(board, k=None):
     """
     Returns the winner of the game, if there is one.
     """
-    wins = []
-
-    # rows
-    for i in range(3):
-        wins.append(set([board[i][r] for r in range(3)])) # e.g. [0][0], [0][1], [0][2]
-
-    # columns
-    for i in range(3):
-        wins.append(set([board[c][i] for c in range(3)])) # e.g. [0][0], [1][0], [2][0]
-
-    # diagonals
-    wins.append(set([board[i][i] for i in range(3)])) # [0][0], [1][1], [2][2]
-    wins.append(set([board[i][2 - i] for i in range(3)])) # [0][2], [1][1], [2][0]
+    geometry = board_geometry(board, k)
+    x, o = bitboard.encode(board)
 
     #If X wins game, return X. If O wins game, return O. If no winner, return None
-    for values in wins:
-        if values == {X}:
-            return X
-        elif values == {O}:
-            return O
+    if geometry.wins(x):
+        return X
+    elif geometry.wins(o):
+        return O
     return None
 
 
-def terminal(board):
+def terminal(board, k=None):
     """
     Returns True if game is over, False otherwise.
     *If the game is over, either because someone has won the game or because all cells have been filled without anyone winning,
     the function should return True.
     *Otherwise, the function should return False if the game is still in progress.
     """
-    if not actions(board) or winner(board) != None:
+    if not actions(board) or winner(board, k) != None:
         return True
     else:
         return False
 
 
-def utility(board):
+def utility(board, k=None):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
-    W = winner(board)
+    W = winner(board, k)
 
     # if X won game -> utility of 1
     if W == X:
@@ -133,69 +205,331 @@ def utility(board):
         return 0
 
 
-def MAX_value(board):
+def canonical(board, k=None):
+    """
+    Returns a key for the board that is the same for all of its
+    rotations and reflections.
+    """
+    return board_geometry(board, k).canonical(*bitboard.encode(board))
+
+
+def value(board, k=None):
+    """
+    Takes state as input and returns the minimax value of the state,
+    maximizing if X has the next turn and minimizing if O does.
+    """
+    return full_value(*bitboard.encode(board), board_geometry(board, k))
+
+
+def full_value(x, o, geometry):
     """
-    Takes state as input and returns output the maximizing value of the state.
+    Returns the minimax value of the (x, o) bitboards by searching every
+    move, for whichever player has the next turn.
     """
+    stats["nodes"] += 1
     # if game over, return winner
-    if terminal(board):
-        return utility(board)
-    # initial value low as possible
-    v = -math.inf
-    # loop through possible actions and pick the maximum of the min player's scores
-    for action in actions(board):
-        v = max(v, MIN_value(result(board, action)))
+    if geometry.wins(x):
+        return 1
+    if geometry.wins(o):
+        return -1
+    empty = ~(x | o) & geometry.full
+    if not empty:
+        return 0
+    # reuse the value if this position (or a symmetric one) was solved before
+    key = (geometry.key, geometry.canonical(x, o))
+    entry = transpositions.get(key)
+    if entry is not None and entry[1] == EXACT:
+        return entry[0]
+    # X picks the maximum of O's replies, O the minimum of X's
+    if bitboard.x_to_move(x, o):
+        v = -math.inf
+        for index in geometry.order:
+            if empty >> index & 1:
+                v = max(v, full_value(x | 1 << index, o, geometry))
+    else:
+        v = math.inf
+        for index in geometry.order:
+            if empty >> index & 1:
+                v = min(v, full_value(x, o | 1 << index, geometry))
+    transpositions.put(key, v, EXACT)
     return v
 
 
-def MIN_value(board):
+def order_actions(board, k=None):
     """
-    Takes state as input and return output the  minimizing value of state.
+    Returns the possible actions, most promising first: moves that win
+    immediately, then the cells on the most lines, nearest the center first.
     """
-    # if game over, return winner
-    if terminal(board):
-        return utility(board)
-    # initial value high as possible
-    v = math.inf
-    #loop through possible actions and pick minimum of max player's scores
-    for action in actions(board):
-        v = min(v, MAX_value(result(board, action)))
+    geometry = board_geometry(board, k)
+    return [geometry.to_action(index)
+            for index in ordered_moves(*bitboard.encode(board), geometry)]
+
+
+def ordered_moves(x, o, geometry):
+    """
+    Returns the empty cell indices of the (x, o) bitboards, moves that
+    win immediately for the player to move first.
+    """
+    empty = ~(x | o) & geometry.full
+    mine = x if bitboard.x_to_move(x, o) else o
+    winning = []
+    others = []
+    for index in geometry.order:
+        if empty >> index & 1:
+            if geometry.wins_through(mine | 1 << index, index):
+                winning.append(index)
+            else:
+                others.append(index)
+    return winning + others
+
+
+def alphabeta(board, alpha, beta, k=None):
+    """
+    Returns the minimax value of the board, skipping branches that
+    cannot change the result given the window (alpha, beta).
+    """
+    x, o = bitboard.encode(board)
+    return alphabeta_value(x, o, alpha, beta, board_geometry(board, k))
+
+
+def alphabeta_value(x, o, alpha, beta, geometry):
+    """
+    Returns the minimax value of the (x, o) bitboards with alpha-beta pruning.
+    """
+    stats["nodes"] += 1
+    if geometry.wins(x):
+        return 1
+    if geometry.wins(o):
+        return -1
+    if x | o == geometry.full:
+        return 0
+
+    # a stored value may settle the position or narrow the window
+    key = (geometry.key, geometry.canonical(x, o))
+    entry = transpositions.get(key)
+    if entry is not None:
+        value, kind = entry
+        if kind == EXACT:
+            return value
+        elif kind == LOWER:
+            alpha = max(alpha, value)
+        else:
+            beta = min(beta, value)
+        if alpha >= beta:
+            return value
+    window = (alpha, beta)
+
+    # the max player (X) raises alpha, the min player (O) lowers beta
+    if bitboard.x_to_move(x, o):
+        v = -math.inf
+        for index in ordered_moves(x, o, geometry):
+            v = max(v, alphabeta_value(x | 1 << index, o, alpha, beta, geometry))
+            alpha = max(alpha, v)
+            if alpha >= beta:
+                break
+    else:
+        v = math.inf
+        for index in ordered_moves(x, o, geometry):
+            v = min(v, alphabeta_value(x, o | 1 << index, alpha, beta, geometry))
+            beta = min(beta, v)
+            if alpha >= beta:
+                break
+
+    # a value outside the window is only a bound on the true value
+    if v <= window[0]:
+        transpositions.put(key, v, UPPER)
+    elif v >= window[1]:
+        transpositions.put(key, v, LOWER)
+    else:
+        transpositions.put(key, v, EXACT)
+    return v
+
+
+def evaluate(x, o, geometry):
+    """
+    Estimates how good a non-terminal position is for X: every line still
+    open to only one player counts for that player, more the fuller it is.
+    """
+    score = 0
+    for mask in geometry.win_masks:
+        x_cells = bitboard.count_cells(x & mask)
+        o_cells = bitboard.count_cells(o & mask)
+        if not o_cells and x_cells:
+            score += 4 ** x_cells
+        elif not x_cells and o_cells:
+            score -= 4 ** o_cells
+    return score
+
+
+def limited_value(x, o, geometry, depth, ply, alpha, beta, deadline, best_moves):
+    """
+    Returns the alpha-beta value of the (x, o) bitboards searched `depth`
+    moves ahead, scoring unfinished positions with evaluate.
+
+    Raises Timeout once the deadline has passed. `best_moves` remembers
+    the best move found in each position, which is tried first next time.
+    """
+    stats["nodes"] += 1
+    if stats["nodes"] % 1024 == 0 and time.time() > deadline:
+        raise Timeout
+    if geometry.wins(x):
+        return WIN_SCORE - ply
+    if geometry.wins(o):
+        return ply - WIN_SCORE
+    if x | o == geometry.full:
+        return 0
+    if depth == 0:
+        return evaluate(x, o, geometry)
+
+    moves = ordered_moves(x, o, geometry)
+    previous = best_moves.get((x, o))
+    if previous is not None:
+        moves.remove(previous)
+        moves.insert(0, previous)
+
+    best_index = None
+    if bitboard.x_to_move(x, o):
+        v = -math.inf
+        for index in moves:
+            child = limited_value(x | 1 << index, o, geometry, depth - 1, ply + 1,
+                                  alpha, beta, deadline, best_moves)
+            if child > v:
+                v = child
+                best_index = index
+            alpha = max(alpha, v)
+            if alpha >= beta:
+                break
+    else:
+        v = math.inf
+        for index in moves:
+            child = limited_value(x, o | 1 << index, geometry, depth - 1, ply + 1,
+                                  alpha, beta, deadline, best_moves)
+            if child < v:
+                v = child
+                best_index = index
+            beta = min(beta, v)
+            if alpha >= beta:
+                break
+    best_moves[(x, o)] = best_index
     return v
 
 
-def minimax(board):
+def deepening_move(x, o, geometry, time_limit):
+    """
+    Returns the cell index of the best move found on the (x, o) bitboards
+    by searching one move deeper at a time until `time_limit` seconds pass.
+    """
+    deadline = time.time() + time_limit
+    best_moves = {}
+    empty_cells = geometry.size - bitboard.count_cells(x | o)
+    best_index = ordered_moves(x, o, geometry)[0]
+    for depth in range(1, empty_cells + 1):
+        try:
+            value = limited_value(x, o, geometry, depth, 0, -math.inf, math.inf,
+                                  deadline, best_moves)
+        except Timeout:
+            break
+        best_index = best_moves[(x, o)]
+        stats["depth"] = depth
+
+        # stop early once the search has found a forced result
+        if abs(value) > WIN_SCORE - geometry.size:
+            break
+    return best_index
+
+
+def minimax(board, pruning=True, k=None, time_limit=None):
     """
     Returns the optimal action for the current player on the board.
     *The move returned should be the optimal action (i, j) that is one of the allowable actions on the board.
     *If multiple moves are equally optimal, any of those moves is acceptable.
     *If the board is a terminal board, the minimax function should return None.
+    *With pruning, alpha-beta search with move ordering is used instead of a full search.
+    *`k` in a row wins; by default a full row on the shorter side of the board.
+    *With a `time_limit` in seconds, or on boards larger than 3x3, the best move
+    found by iterative deepening within the time limit is returned instead.
+    *Standard 3x3 games are answered from the opening book when one is loaded.
     """
+    stats["nodes"] = 0
+    stats["depth"] = None
+
     #if game over, return None
-    if terminal(board):
+    if terminal(board, k):
         return None
 
     # first move by AI
-    if len(actions(board)) == 9:
+    geometry = board_geometry(board, k)
+    if len(actions(board)) == geometry.size:
         return (random.choice(actions(board)))
 
+    # search on bitboards, then translate the chosen cell back to (i, j)
+    x, o = bitboard.encode(board)
+
+    # answer standard games straight from the opening book when there is one
+    if opening_book is not None and geometry.key == (3, 3, 3):
+        entry = opening_book.lookup(x, o)
+        if entry is not None:
+            _, moves = entry
+            return geometry.to_action(
+                next(index for index in geometry.order if index in moves)
+            )
+
+    if time_limit is not None or geometry.size > EXACT_CELLS:
+        if time_limit is None:
+            time_limit = DEFAULT_TIME_LIMIT
+        return geometry.to_action(deepening_move(x, o, geometry, time_limit))
+    if pruning:
+        return geometry.to_action(alphabeta_move(x, o, geometry))
+
     #the max player (X) picks action which gives highest value from min player
-    if player(board) == X:
+    if bitboard.x_to_move(x, o):
         v = -math.inf
-        result_action = None
-        for action in actions(board):
-            min_result = MIN_value(result(board, action))
-            if min_result > v:
-                v = min_result
-                result_action = action
+        result_index = None
+        for index in geometry.order:
+            if not (x | o) >> index & 1:
+                min_result = full_value(x | 1 << index, o, geometry)
+                if min_result > v:
+                    v = min_result
+                    result_index = index
 
     #the min player (O) picks action which gives lowest value from max player
-    if player(board) == O:
+    else:
         v = math.inf
-        result_action = None
-        for action in actions(board):
-            max_result = MAX_value(result(board, action))
-            if max_result < v:
-                v = max_result
-                result_action = action
-
-    return result_action
+        result_index = None
+        for index in geometry.order:
+            if not (x | o) >> index & 1:
+                max_result = full_value(x, o | 1 << index, geometry)
+                if max_result < v:
+                    v = max_result
+                    result_index = index
+
+    return geometry.to_action(result_index)
+
+
+def alphabeta_move(x, o, geometry):
+    """
+    Returns the cell index of the optimal move on the (x, o) bitboards
+    using alpha-beta search.
+    """
+    x_turn = bitboard.x_to_move(x, o)
+    best_index = None
+    alpha = -math.inf
+    beta = math.inf
+    for index in ordered_moves(x, o, geometry):
+        if x_turn:
+            v = alphabeta_value(x | 1 << index, o, alpha, beta, geometry)
+        else:
+            v = alphabeta_value(x, o | 1 << index, alpha, beta, geometry)
+
+        # X keeps the highest value, O the lowest; stop at a forced win
+        if x_turn and v > alpha:
+            alpha = v
+            best_index = index
+            if v == 1:
+                break
+        elif not x_turn and v < beta:
+            beta = v
+            best_index = index
+            if v == -1:
+                break
+    return best_index
@@ -1,12 +1,46 @@
+import contextlib
 import itertools
+import time
+import weakref
+
+# Every frozen sentence built so far, keyed by type and parts, so that
+# equal frozen sentences are one shared object
+interned = weakref.WeakValueDictionary()
 
 
 class Sentence():
+    """
+    Sentences are frozen: shared between equal sentences and never
+    changed, except for an And or Or built directly, which can be added
+    to. Such a sentence is frozen into a shared copy when it is used
+    inside another one. Every sentence caches its hash and symbols.
+    """
+    __slots__ = ("__weakref__", "frozen", "hash_value", "symbols_value")
+
+    def __hash__(self):
+        if self.hash_value is None:
+            self.hash_value = self.find_hash()
+        return self.hash_value
+
+    @property
+    def symbol_set(self):
+        """Returns a frozenset of all symbols in the logical sentence."""
+        if self.symbols_value is None:
+            self.symbols_value = self.find_symbols()
+        return self.symbols_value
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
 
+    def evaluate_partial(self, model):
+        """
+        Evaluates the logical sentence in a model that may leave symbols
+        unassigned: True or False if every completion of the model
+        agrees, None if the value is not yet known.
+        """
+        raise Exception("nothing to evaluate")
+
     def formula(self):
         """Returns string formula representing logical sentence."""
         return ""
@@ -15,11 +49,62 @@ class Sentence():
         """Returns a set of all symbols in the logical sentence."""
         return set()
 
+    def tseitin(self, encoder):
+        """
+        Returns a literal equivalent to the sentence, adding the clauses
+        that define it to a CNFEncoder.
+        """
+        raise Exception("nothing to encode")
+
+    def to_cnf(self):
+        """
+        Returns an equisatisfiable CNFEncoder holding the sentence as
+        clauses, with one variable per symbol plus one per connective.
+        """
+        encoder = CNFEncoder()
+        encoder.clauses.append([encoder.encode(self)])
+        return encoder
+
+    def truth_table(self, columns, full):
+        """
+        Evaluates the sentence in many models at once.
+
+        `columns` maps each symbol to an integer whose bit j is the
+        symbol's value in model j, and `full` has a bit set for every model.
+        Returns an integer whose bit j is the sentence's value in model j.
+        """
+        raise Exception("nothing to evaluate")
+
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
             raise TypeError("must be a logical sentence")
 
+    @classmethod
+    def make(cls, key, **parts):
+        """
+        Returns the shared frozen sentence for `key`, building it from
+        the given parts the first time.
+        """
+        sentence = interned.get(key)
+        if sentence is None:
+            sentence = object.__new__(cls)
+            for name, part in parts.items():
+                setattr(sentence, name, part)
+            sentence.frozen = True
+            sentence.hash_value = None
+            sentence.symbols_value = None
+            interned[key] = sentence
+        return sentence
+
+    @classmethod
+    def freeze(cls, sentence):
+        """Returns the shared frozen sentence equal to `sentence`."""
+        Sentence.validate(sentence)
+        if sentence.frozen:
+            return sentence
+        return sentence.frozen_copy()
+
     @classmethod
     def parenthesize(cls, s):
         """Parenthesizes an expression if not already parenthesized."""
@@ -43,16 +128,27 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
+
+    def __new__(cls, name):
+        return cls.make((cls, name), name=name)
 
-    def __init__(self, name):
-        self.name = name
+    def __reduce__(self):
+        return (type(self), (self.name,))
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (
+            isinstance(other, Symbol) and self.name == other.name
+        )
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def find_hash(self):
         return hash(("symbol", self.name))
 
+    def find_symbols(self):
+        return frozenset((self.name,))
+
     def __repr__(self):
         return self.name
 
@@ -62,51 +158,111 @@ class Symbol(Sentence):
         except KeyError:
             raise Exception(f"variable {self.name} not in model")
 
+    def evaluate_partial(self, model):
+        return model.get(self.name)
+
     def formula(self):
         return self.name
 
     def symbols(self):
-        return {self.name}
+        return set(self.symbol_set)
+
+    def tseitin(self, encoder):
+        return encoder.symbol(self.name)
+
+    def truth_table(self, columns, full):
+        try:
+            return columns[self.name]
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
 
 
 class Not(Sentence):
-    def __init__(self, operand):
-        Sentence.validate(operand)
-        self.operand = operand
+    __slots__ = ("operand",)
+
+    def __new__(cls, operand):
+        operand = Sentence.freeze(operand)
+        return cls.make((cls, id(operand)), operand=operand)
+
+    def __reduce__(self):
+        return (type(self), (self.operand,))
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        # Equal frozen sentences are always the same object
+        return self is other or (
+            isinstance(other, Not)
+            and not (self.frozen and other.frozen)
+            and self.operand == other.operand
+        )
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def find_hash(self):
         return hash(("not", hash(self.operand)))
 
+    def find_symbols(self):
+        return self.operand.symbol_set
+
     def __repr__(self):
         return f"Not({self.operand})"
 
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
+    def evaluate_partial(self, model):
+        value = self.operand.evaluate_partial(model)
+        return None if value is None else not value
+
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
     def symbols(self):
-        return self.operand.symbols()
+        return set(self.symbol_set)
+
+    def tseitin(self, encoder):
+        return -encoder.encode(self.operand)
+
+    def truth_table(self, columns, full):
+        return full ^ self.operand.truth_table(columns, full)
 
 
 class And(Sentence):
+    __slots__ = ("conjuncts",)
+
     def __init__(self, *conjuncts):
-        for conjunct in conjuncts:
-            Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
+        self.conjuncts = [Sentence.freeze(conjunct) for conjunct in conjuncts]
+        self.frozen = False
+        self.hash_value = None
+        self.symbols_value = None
+
+    def __reduce__(self):
+        return (type(self), tuple(self.conjuncts))
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return self is other or (
+            isinstance(other, And)
+            and not (self.frozen and other.frozen)
+            and hash(self) == hash(other)
+            and list(self.conjuncts) == list(other.conjuncts)
+        )
 
-    def __hash__(self):
+    def frozen_copy(self):
+        conjuncts = tuple(self.conjuncts)
+        return self.make((type(self),) + tuple(map(id, conjuncts)),
+                         conjuncts=conjuncts)
+
+    __hash__ = Sentence.__hash__
+
+    def find_hash(self):
         return hash(
             ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
         )
 
+    def find_symbols(self):
+        return frozenset().union(
+            *[conjunct.symbol_set for conjunct in self.conjuncts]
+        )
+
     def __repr__(self):
         conjunctions = ", ".join(
             [str(conjunct) for conjunct in self.conjuncts]
@@ -114,12 +270,25 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
-        Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
+        if self.frozen:
+            raise TypeError("cannot add to a sentence used inside another")
+        self.conjuncts.append(Sentence.freeze(conjunct))
+        self.hash_value = None
+        self.symbols_value = None
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
+    def evaluate_partial(self, model):
+        result = True
+        for conjunct in self.conjuncts:
+            value = conjunct.evaluate_partial(model)
+            if value is False:
+                return False
+            if value is None:
+                result = None
+        return result
+
     def formula(self):
         if len(self.conjuncts) == 1:
             return self.conjuncts[0].formula()
@@ -127,23 +296,62 @@ class And(Sentence):
                            for conjunct in self.conjuncts])
 
     def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+        return set(self.symbol_set)
+
+    def tseitin(self, encoder):
+        literals = [encoder.encode(conjunct) for conjunct in self.conjuncts]
+        if len(literals) == 1:
+            return literals[0]
+        v = encoder.new_variable()
+        for literal in literals:
+            encoder.clauses.append([-v, literal])
+        encoder.clauses.append([v] + [-literal for literal in literals])
+        return v
+
+    def truth_table(self, columns, full):
+        table = full
+        for conjunct in self.conjuncts:
+            table &= conjunct.truth_table(columns, full)
+        return table
 
 
 class Or(Sentence):
+    __slots__ = ("disjuncts",)
+
     def __init__(self, *disjuncts):
-        for disjunct in disjuncts:
-            Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+        self.disjuncts = [Sentence.freeze(disjunct) for disjunct in disjuncts]
+        self.frozen = False
+        self.hash_value = None
+        self.symbols_value = None
+
+    def __reduce__(self):
+        return (type(self), tuple(self.disjuncts))
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return self is other or (
+            isinstance(other, Or)
+            and not (self.frozen and other.frozen)
+            and hash(self) == hash(other)
+            and list(self.disjuncts) == list(other.disjuncts)
+        )
 
-    def __hash__(self):
+    def frozen_copy(self):
+        disjuncts = tuple(self.disjuncts)
+        return self.make((type(self),) + tuple(map(id, disjuncts)),
+                         disjuncts=disjuncts)
+
+    __hash__ = Sentence.__hash__
+
+    def find_hash(self):
         return hash(
             ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
         )
 
+    def find_symbols(self):
+        return frozenset().union(
+            *[disjunct.symbol_set for disjunct in self.disjuncts]
+        )
+
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
         return f"Or({disjuncts})"
@@ -151,6 +359,16 @@ class Or(Sentence):
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
+    def evaluate_partial(self, model):
+        result = False
+        for disjunct in self.disjuncts:
+            value = disjunct.evaluate_partial(model)
+            if value is True:
+                return True
+            if value is None:
+                result = None
+        return result
+
     def formula(self):
         if len(self.disjuncts) == 1:
             return self.disjuncts[0].formula()
@@ -158,24 +376,53 @@ class Or(Sentence):
                             for disjunct in self.disjuncts])
 
     def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+        return set(self.symbol_set)
+
+    def tseitin(self, encoder):
+        literals = [encoder.encode(disjunct) for disjunct in self.disjuncts]
+        if len(literals) == 1:
+            return literals[0]
+        v = encoder.new_variable()
+        for literal in literals:
+            encoder.clauses.append([v, -literal])
+        encoder.clauses.append([-v] + literals)
+        return v
+
+    def truth_table(self, columns, full):
+        table = 0
+        for disjunct in self.disjuncts:
+            table |= disjunct.truth_table(columns, full)
+        return table
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
-        Sentence.validate(antecedent)
-        Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
+    __slots__ = ("antecedent", "consequent")
+
+    def __new__(cls, antecedent, consequent):
+        antecedent = Sentence.freeze(antecedent)
+        consequent = Sentence.freeze(consequent)
+        return cls.make((cls, id(antecedent), id(consequent)),
+                        antecedent=antecedent, consequent=consequent)
+
+    def __reduce__(self):
+        return (type(self), (self.antecedent, self.consequent))
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (
+            isinstance(other, Implication)
+            and not (self.frozen and other.frozen)
+            and self.antecedent == other.antecedent
+            and self.consequent == other.consequent
+        )
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def find_hash(self):
         return hash(("implies", hash(self.antecedent), hash(self.consequent)))
 
+    def find_symbols(self):
+        return self.antecedent.symbol_set | self.consequent.symbol_set
+
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
 
@@ -183,30 +430,66 @@ class Implication(Sentence):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
 
+    def evaluate_partial(self, model):
+        antecedent = self.antecedent.evaluate_partial(model)
+        if antecedent is False:
+            return True
+        consequent = self.consequent.evaluate_partial(model)
+        if consequent is True:
+            return True
+        if antecedent is True and consequent is False:
+            return False
+        return None
+
     def formula(self):
         antecedent = Sentence.parenthesize(self.antecedent.formula())
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
     def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+        return set(self.symbol_set)
+
+    def tseitin(self, encoder):
+        a = encoder.encode(self.antecedent)
+        c = encoder.encode(self.consequent)
+        v = encoder.new_variable()
+        encoder.clauses.append([-v, -a, c])
+        encoder.clauses.append([v, a])
+        encoder.clauses.append([v, -c])
+        return v
+
+    def truth_table(self, columns, full):
+        return ((full ^ self.antecedent.truth_table(columns, full))
+                | self.consequent.truth_table(columns, full))
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
-        Sentence.validate(left)
-        Sentence.validate(right)
-        self.left = left
-        self.right = right
+    __slots__ = ("left", "right")
+
+    def __new__(cls, left, right):
+        left = Sentence.freeze(left)
+        right = Sentence.freeze(right)
+        return cls.make((cls, id(left), id(right)), left=left, right=right)
+
+    def __reduce__(self):
+        return (type(self), (self.left, self.right))
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (
+            isinstance(other, Biconditional)
+            and not (self.frozen and other.frozen)
+            and self.left == other.left
+            and self.right == other.right
+        )
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def find_hash(self):
         return hash(("biconditional", hash(self.left), hash(self.right)))
 
+    def find_symbols(self):
+        return self.left.symbol_set | self.right.symbol_set
+
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
@@ -216,23 +499,230 @@ class Biconditional(Sentence):
                 or (not self.left.evaluate(model)
                     and not self.right.evaluate(model)))
 
+    def evaluate_partial(self, model):
+        left = self.left.evaluate_partial(model)
+        if left is None:
+            return None
+        right = self.right.evaluate_partial(model)
+        if right is None:
+            return None
+        return left == right
+
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
     def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
-
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+        return set(self.symbol_set)
+
+    def tseitin(self, encoder):
+        left = encoder.encode(self.left)
+        right = encoder.encode(self.right)
+        v = encoder.new_variable()
+        encoder.clauses.append([-v, -left, right])
+        encoder.clauses.append([-v, left, -right])
+        encoder.clauses.append([v, left, right])
+        encoder.clauses.append([v, -left, -right])
+        return v
+
+    def truth_table(self, columns, full):
+        return full ^ (self.left.truth_table(columns, full)
+                       ^ self.right.truth_table(columns, full))
+
+
+class CNFEncoder():
+    """
+    Tseitin encoding of sentences into clauses over integer variables,
+    in the form used by sat.Solver.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.clauses = []
+
+        # Maps symbol names to their variables
+        self.variables = {}
+
+        # Literal already introduced for each encoded sentence, by id(),
+        # and the sentences themselves so that their ids stay in use
+        self.literals = {}
+        self.encoded = []
+
+    def new_variable(self):
+        self.count += 1
+        return self.count
+
+    def symbol(self, name):
+        if name not in self.variables:
+            self.variables[name] = self.new_variable()
+        return self.variables[name]
+
+    def encode(self, sentence):
+        """
+        Returns a literal equivalent to `sentence`, reusing the one from
+        an earlier identical sentence. Equal nested sentences are one
+        shared object, so they are looked up by identity.
+        """
+        literal = self.literals.get(id(sentence))
+        if literal is None:
+            Sentence.validate(sentence)
+            literal = sentence.tseitin(self)
+            self.literals[id(sentence)] = literal
+            self.encoded.append(sentence)
+        return literal
+
+
+class EvaluationProfile():
+    """
+    Per-sentence evaluation counts and times gathered by profile().
+
+    Times are in seconds. `cumulative` includes the time spent in the
+    sentence's parts and `own` does not. Calls are recorded by id() to
+    keep hashing out of the timings; equal sentences are merged when
+    the results are read.
+    """
+
+    def __init__(self):
+        # Per sentence id: [calls, cumulative time, own time]
+        self.totals = {}
+        self.sentences = {}
+
+        # Time spent in the parts of each evaluation in progress
+        self.stack = [0.0]
+
+    def record(self, sentence, method, model):
+        """Evaluates `sentence` with `method`, timing the call."""
+        self.stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return method(sentence, model)
+        finally:
+            elapsed = time.perf_counter() - start
+            parts = self.stack.pop()
+            self.stack[-1] += elapsed
+            totals = self.totals.get(id(sentence))
+            if totals is None:
+                totals = self.totals[id(sentence)] = [0, 0.0, 0.0]
+                self.sentences[id(sentence)] = sentence
+            totals[0] += 1
+            totals[1] += elapsed
+            totals[2] += elapsed - parts
+
+    def hottest(self, limit=10, key="cumulative"):
+        """
+        Returns (sentence, count, cumulative, own) for the `limit`
+        sentences with the most `key` time ("cumulative" or "own").
+        """
+        merged = {}
+        for sentence_id, (count, cumulative, own) in self.totals.items():
+            sentence = self.sentences[sentence_id]
+            totals = merged.setdefault(sentence, [sentence, 0, 0.0, 0.0])
+            totals[1] += count
+            totals[2] += cumulative
+            totals[3] += own
+        column = 2 if key == "cumulative" else 3
+        rows = sorted(merged.values(), key=lambda row: row[column], reverse=True)
+        return [tuple(row) for row in rows[:limit]]
+
+    def report(self, limit=10, key="cumulative", width=60):
+        """Returns a text table of the hottest sentences."""
+        lines = [f"{'calls':>10} {'cumul ms':>10} {'own ms':>10}  formula"]
+        for sentence, count, cumulative, own in self.hottest(limit, key):
+            formula = sentence.formula()
+            if len(formula) > width:
+                formula = formula[:width - 3] + "..."
+            lines.append(f"{count:>10} {cumulative * 1000:>10.3f} "
+                         f"{own * 1000:>10.3f}  {formula}")
+        return "\n".join(lines)
+
+
+def sentence_classes(cls=Sentence):
+    """Returns `cls` and every class derived from it."""
+    classes = [cls]
+    for subclass in cls.__subclasses__():
+        classes.extend(sentence_classes(subclass))
+    return classes
+
+
+@contextlib.contextmanager
+def profile():
+    """
+    Records every call to evaluate and evaluate_partial made inside the
+    `with` block in the EvaluationProfile it yields.
+
+    The methods are only wrapped while the block runs, so evaluation
+    costs nothing extra otherwise.
+    """
+    results = EvaluationProfile()
+    originals = []
+    for cls in sentence_classes():
+        for name in ("evaluate", "evaluate_partial"):
+            if name in cls.__dict__:
+                originals.append((cls, name, cls.__dict__[name]))
+
+    def timed(method):
+        def evaluate(self, model):
+            return results.record(self, method, model)
+        return evaluate
+
+    for cls, name, method in originals:
+        setattr(cls, name, timed(method))
+    try:
+        yield results
+    finally:
+        for cls, name, method in originals:
+            setattr(cls, name, method)
+
+
+# Symbols evaluated together as bits of one integer by bitwise_check
+BLOCK_SYMBOLS = 16
+
+
+def model_check(knowledge, query, method="enumerate", stats=None, workers=None):
+    """
+    Checks if knowledge base entails query.
+
+    `method` "enumerate" walks every model one at a time;
+    "bitwise" evaluates blocks of models at once as bits of an integer;
+    "parallel" splits the bitwise check across `workers` processes
+    (one per core by default);
+    "sat" asks a SAT solver whether knowledge and not query can both hold.
+
+    When enumerating, a dictionary passed as `stats` receives the number
+    of (partial) models visited and of complete models evaluated.
+    """
+    if method == "bitwise":
+        return bitwise_check(knowledge, query)
+    if method == "parallel":
+        return parallel_check(knowledge, query, workers)
+    if method == "sat":
+        return sat_check(knowledge, query)
+    if method != "enumerate":
+        raise ValueError(f"unknown model checking method: {method}")
+    if stats is None:
+        stats = {}
+    stats["visited"] = 0
+    stats["complete"] = 0
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
+        stats["visited"] += 1
+
+        # Stop early if the partial model already settles the question
+        if symbols:
+            known = knowledge.evaluate_partial(model)
+            if known is False:
+                return True
+            entailed = query.evaluate_partial(model)
+            if entailed is True:
+                return True
+            if known is True and entailed is False:
+                return False
 
         # If model has an assignment for each symbol
         if not symbols:
+            stats["complete"] += 1
 
             # If knowledge base is true in model, then query must also be true
             if knowledge.evaluate(model):
@@ -257,8 +747,262 @@ def model_check(knowledge, query):
                     check_all(knowledge, query, remaining, model_false))
 
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    symbols = set(knowledge.symbol_set | query.symbol_set)
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
-    
\ No newline at end of file
+    
+
+def model_check_many(knowledge, queries, method="enumerate", stats=None,
+                     workers=None):
+    """
+    Checks which of several queries the knowledge base entails, looking
+    at the knowledge base's models (or solving its clauses) only once.
+
+    Returns a list with True for each query that is entailed. `method`,
+    `stats` and `workers` are as for model_check.
+    """
+    queries = list(queries)
+    if method == "bitwise":
+        return bitwise_check_many(knowledge, queries)
+    if method == "parallel":
+        return parallel_check_many(knowledge, queries, workers)
+    if method == "sat":
+        return sat_check_many(knowledge, queries)
+    if method != "enumerate":
+        raise ValueError(f"unknown model checking method: {method}")
+    if stats is None:
+        stats = {}
+    stats["visited"] = 0
+    stats["complete"] = 0
+
+    # Queries not yet shown false in some model of the knowledge base
+    entailed = [True] * len(queries)
+    pending = list(range(len(queries)))
+
+    def check_all(symbols, model):
+        """Rules out the queries false in a model of the knowledge base."""
+        stats["visited"] += 1
+
+        # Skip models the knowledge base already rules out
+        if knowledge.evaluate_partial(model) is False:
+            return
+
+        if not symbols:
+            stats["complete"] += 1
+            for i in list(pending):
+                if not queries[i].evaluate(model):
+                    entailed[i] = False
+                    pending.remove(i)
+        else:
+            remaining = symbols.copy()
+            p = remaining.pop()
+            for value in (True, False):
+                if not pending:
+                    return
+                model[p] = value
+                check_all(remaining, model)
+            del model[p]
+
+    symbols = set(knowledge.symbol_set.union(
+        *[query.symbol_set for query in queries]
+    ))
+    check_all(symbols, dict())
+    return entailed
+
+
+def columns_for(symbols):
+    """
+    Returns the truth table columns for a list of symbols over all of
+    their 2^n models: bit j of symbol i's column is bit i of j.
+    """
+    size = 1 << len(symbols)
+    columns = {}
+    for i, symbol in enumerate(symbols):
+        # Runs of 2^i zeros then 2^i ones, doubled up to the full size
+        period = 1 << i
+        column = ((1 << period) - 1) << period
+        length = period * 2
+        while length < size:
+            column |= column << length
+            length *= 2
+        columns[symbol] = column
+    return columns
+
+
+def bitwise_check(knowledge, query, fixed=None):
+    """
+    Checks if knowledge base entails query by evaluating up to
+    2^BLOCK_SYMBOLS models at once as the bits of one integer.
+
+    `fixed` may map some symbols to values, in which case only the
+    models that agree with them are checked.
+    """
+    fixed = fixed or {}
+    symbols = sorted((knowledge.symbol_set | query.symbol_set) - fixed.keys())
+    inner = symbols[:BLOCK_SYMBOLS]
+    outer = symbols[BLOCK_SYMBOLS:]
+    columns = columns_for(inner)
+    full = (1 << (1 << len(inner))) - 1
+    for symbol, value in fixed.items():
+        columns[symbol] = full if value else 0
+
+    # Symbols beyond the block are fixed to each combination in turn
+    for assignment in range(1 << len(outer)):
+        for i, symbol in enumerate(outer):
+            columns[symbol] = full if assignment >> i & 1 else 0
+
+        # Any model where the knowledge holds but the query fails is a counter-model
+        if knowledge.truth_table(columns, full) & ~query.truth_table(columns, full):
+            return False
+    return True
+
+
+# Parts of the models handed out per worker, so that the load evens out
+PARTS_PER_WORKER = 4
+
+# Knowledge, queries and split symbols of the check a pool worker is running
+parallel_problem = None
+
+
+def parallel_check(knowledge, query, workers=None):
+    """
+    Checks if knowledge base entails query across a pool of processes.
+    """
+    return parallel_check_many(knowledge, [query], workers)[0]
+
+
+def parallel_check_many(knowledge, queries, workers=None):
+    """
+    Checks which queries the knowledge base entails across a pool of
+    processes.
+
+    The models are split once by fixing the first few symbols to each of
+    their combinations, and each part is checked against every query with
+    bitwise_check_many. Every worker is stopped as soon as each query has
+    a counter-model.
+    """
+    import multiprocessing
+
+    workers = workers or multiprocessing.cpu_count()
+    symbols = sorted(knowledge.symbol_set.union(
+        *[query.symbol_set for query in queries]
+    ))
+
+    # A single block of models is quicker than starting processes
+    if workers == 1 or len(symbols) <= BLOCK_SYMBOLS:
+        return bitwise_check_many(knowledge, queries)
+
+    split = symbols[:min(len(symbols), (PARTS_PER_WORKER * workers - 1).bit_length())]
+    entailed = [True] * len(queries)
+    with multiprocessing.Pool(workers, initializer=start_worker,
+                              initargs=(knowledge, queries, split)) as pool:
+        for part in pool.imap_unordered(check_part, range(1 << len(split))):
+            entailed = [a and b for a, b in zip(entailed, part)]
+            if not any(entailed):
+                # Leaving the block terminates the remaining workers
+                break
+    return entailed
+
+
+def start_worker(knowledge, queries, split):
+    """Pool initializer storing the check for check_part."""
+    global parallel_problem
+    parallel_problem = (knowledge, queries, split)
+
+
+def check_part(assignment):
+    """
+    Pool entry point checking the models where split symbol i has
+    bit i of `assignment` as its value.
+    """
+    knowledge, queries, split = parallel_problem
+    fixed = {symbol: bool(assignment >> i & 1) for i, symbol in enumerate(split)}
+    return bitwise_check_many(knowledge, queries, fixed)
+
+
+def bitwise_check_many(knowledge, queries, fixed=None):
+    """
+    Checks which queries the knowledge base entails, computing the
+    knowledge base's truth table for each block of models only once.
+
+    `fixed` may map some symbols to values, in which case only the
+    models that agree with them are checked.
+    """
+    fixed = fixed or {}
+    symbols = sorted(knowledge.symbol_set.union(
+        *[query.symbol_set for query in queries]
+    ) - fixed.keys())
+    inner = symbols[:BLOCK_SYMBOLS]
+    outer = symbols[BLOCK_SYMBOLS:]
+    columns = columns_for(inner)
+    full = (1 << (1 << len(inner))) - 1
+    for symbol, value in fixed.items():
+        columns[symbol] = full if value else 0
+
+    entailed = [True] * len(queries)
+    for assignment in range(1 << len(outer)):
+        for i, symbol in enumerate(outer):
+            columns[symbol] = full if assignment >> i & 1 else 0
+        table = knowledge.truth_table(columns, full)
+        if not table:
+            continue
+        for i, query in enumerate(queries):
+            if entailed[i] and table & ~query.truth_table(columns, full):
+                entailed[i] = False
+        if not any(entailed):
+            break
+    return entailed
+
+
+def sat_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, which holds exactly when
+    knowledge ∧ ¬query is unsatisfiable.
+    """
+    from sat import Solver
+
+    encoder = CNFEncoder()
+    encoder.clauses.append([encoder.encode(knowledge)])
+    encoder.clauses.append([-encoder.encode(query)])
+    solver = Solver()
+    for clause in encoder.clauses:
+        if not solver.add_clause(clause):
+            return True
+    return not solver.solve()
+
+
+def sat_check_many(knowledge, queries):
+    """
+    Checks which queries the knowledge base entails with one incremental
+    SAT solver: the knowledge base is encoded once, and each query is
+    solved for under the assumption that it is false.
+    """
+    from sat import Solver
+
+    encoder = CNFEncoder()
+    encoder.clauses.append([encoder.encode(knowledge)])
+    literals = [encoder.encode(query) for query in queries]
+    solver = Solver()
+    for clause in encoder.clauses:
+        if not solver.add_clause(clause):
+            return [True] * len(queries)
+
+    # Queries may use variables that no clause mentions
+    while solver.count < encoder.count:
+        solver.new_variable()
+
+    entailed = [None] * len(queries)
+    for i, literal in enumerate(literals):
+        if entailed[i] is not None:
+            continue
+        if not solver.solve([-literal]):
+            entailed[i] = True
+            continue
+
+        # The model found also refutes every other query false in it
+        for j in range(i, len(literals)):
+            literal = literals[j]
+            if entailed[j] is None and solver.model[abs(literal)] != (literal > 0):
+                entailed[j] = False
+    return entailed
@@ -0,0 +1,273 @@
+"""
+Conflict-driven clause learning (CDCL) SAT solver.
+
+Variables are positive integers and literals are non-zero integers:
+`v` is the variable being true and `-v` it being false. A clause is a
+list of literals, at least one of which must hold.
+"""
+
+
+class Solver():
+
+    def __init__(self):
+        self.count = 0
+        self.clauses = []
+
+        # Maps each literal to the indices of the clauses watching it
+        self.watches = {}
+
+        # Per variable (index 0 unused): 1 true, -1 false, 0 unassigned
+        self.assigns = [0]
+        self.levels = [0]
+        self.reasons = [None]
+        self.activity = [0.0]
+        self.phases = [False]
+        self.increment = 1.0
+
+        # Assigned literals in order, and where each decision level starts
+        self.trail = []
+        self.limits = []
+        self.head = 0
+
+        self.unsatisfiable = False
+        self.model = None
+        self.conflicts = 0
+        self.decisions = 0
+
+    def new_variable(self):
+        """Adds a variable and returns it."""
+        self.count += 1
+        self.assigns.append(0)
+        self.levels.append(0)
+        self.reasons.append(None)
+        self.activity.append(0.0)
+        self.phases.append(False)
+        self.watches[self.count] = []
+        self.watches[-self.count] = []
+        return self.count
+
+    def value(self, literal):
+        """Returns 1 if the literal is true, -1 if false, 0 if unassigned."""
+        value = self.assigns[abs(literal)]
+        return value if literal > 0 else -value
+
+    def add_clause(self, literals):
+        """
+        Adds a clause. Returns False if the solver is now known to be
+        unsatisfiable.
+        """
+        self.backtrack(0)
+        clause = []
+        for literal in literals:
+            while abs(literal) > self.count:
+                self.new_variable()
+
+            # Drop tautologies, repeats and literals false at level 0
+            if -literal in clause or self.value(literal) == 1:
+                return True
+            if literal not in clause and self.value(literal) == 0:
+                clause.append(literal)
+
+        if not clause:
+            self.unsatisfiable = True
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            if self.propagate() is not None:
+                self.unsatisfiable = True
+        else:
+            self.attach(clause)
+        return not self.unsatisfiable
+
+    def attach(self, clause):
+        """Stores a clause and watches its first two literals."""
+        index = len(self.clauses)
+        self.clauses.append(clause)
+        self.watches[clause[0]].append(index)
+        self.watches[clause[1]].append(index)
+        return index
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.assigns[variable] = 1 if literal > 0 else -1
+        self.levels[variable] = len(self.limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def backtrack(self, level):
+        """Undoes every assignment made above decision level `level`."""
+        if len(self.limits) <= level:
+            return
+        start = self.limits[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phases[variable] = literal > 0
+            self.assigns[variable] = 0
+            self.reasons[variable] = None
+        del self.trail[start:]
+        del self.limits[level:]
+        self.head = len(self.trail)
+
+    def propagate(self):
+        """
+        Assigns every literal forced by unit clauses.
+
+        Returns the index of a clause with every literal false, or None.
+        """
+        while self.head < len(self.trail):
+            false_literal = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches[false_literal]
+            kept = []
+            conflict = None
+            for position, index in enumerate(watching):
+                clause = self.clauses[index]
+
+                # Keep the false literal second
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.value(clause[0]) == 1:
+                    kept.append(index)
+                    continue
+
+                # Look for another literal to watch
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) != -1:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches[clause[1]].append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if self.value(clause[0]) == -1:
+                        conflict = index
+                        kept.extend(watching[position + 1:])
+                        break
+                    self.assign(clause[0], index)
+            self.watches[false_literal] = kept
+            if conflict is not None:
+                return conflict
+        return None
+
+    def analyze(self, conflict):
+        """
+        Derives a learned clause from a conflict by resolving back to the
+        first unique implication point.
+
+        Returns the clause, asserting literal first, and the level to
+        jump back to.
+        """
+        level = len(self.limits)
+        seen = set()
+        learned = [None]
+        pending = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = self.clauses[conflict]
+        while True:
+            for other in (clause if literal is None else clause[1:]):
+                variable = abs(other)
+                if variable not in seen and self.levels[variable] > 0:
+                    seen.add(variable)
+                    self.bump(variable)
+                    if self.levels[variable] == level:
+                        pending += 1
+                    else:
+                        learned.append(other)
+
+            # Resolve on the latest assigned literal of this level
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reasons[abs(literal)]]
+        learned[0] = -literal
+
+        # Watch the literal from the highest remaining level second
+        back = 0
+        if len(learned) > 1:
+            best = max(range(1, len(learned)),
+                       key=lambda k: self.levels[abs(learned[k])])
+            learned[1], learned[best] = learned[best], learned[1]
+            back = self.levels[abs(learned[1])]
+        return learned, back
+
+    def bump(self, variable):
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.increment *= 1e-100
+
+    def pick(self):
+        """Returns the most active unassigned variable, or None."""
+        best = None
+        for variable in range(1, self.count + 1):
+            if self.assigns[variable] == 0 and (
+                best is None or self.activity[variable] > self.activity[best]
+            ):
+                best = variable
+        return best
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses (with every literal in `assumptions`
+        held true) can all be satisfied, in which case `model` maps each
+        variable to its value.
+        """
+        self.model = None
+        if self.unsatisfiable:
+            return False
+        self.backtrack(0)
+        for literal in assumptions:
+            while abs(literal) > self.count:
+                self.new_variable()
+
+        restart = 100
+        since_restart = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                since_restart += 1
+                if not self.limits:
+                    self.unsatisfiable = True
+                    return False
+                learned, back = self.analyze(conflict)
+                self.backtrack(back)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.assign(learned[0], self.attach(learned))
+                self.increment /= 0.95
+
+                # Restart now and then, keeping what has been learned
+                if since_restart >= restart:
+                    self.backtrack(0)
+                    since_restart = 0
+                    restart = int(restart * 1.5)
+                continue
+
+            # Decide the assumptions first, one level each
+            literal = None
+            while len(self.limits) < len(assumptions):
+                assumption = assumptions[len(self.limits)]
+                if self.value(assumption) == -1:
+                    self.backtrack(0)
+                    return False
+                self.limits.append(len(self.trail))
+                if self.value(assumption) == 0:
+                    literal = assumption
+                    break
+            if literal is None:
+                variable = self.pick()
+                if variable is None:
+                    self.model = {
+                        v: self.assigns[v] == 1 for v in range(1, self.count + 1)
+                    }
+                    self.backtrack(0)
+                    return True
+                literal = variable if self.phases[variable] else -variable
+                self.limits.append(len(self.trail))
+            self.decisions += 1
+            self.assign(literal, None)
@@ -1,5 +1,6 @@
 import itertools
 import random
+from collections import deque
 
 
 class Minesweeper():
@@ -168,6 +169,17 @@ class MinesweeperAI():
         # Set of sentences about the game known to be true
         self.knowledge = []
 
+        # Sentences that changed since they were last checked for
+        # conclusions, and the ids of those in the queue
+        self.pending = deque()
+        self.queued = set()
+
+        # Maps each cell to the sentences holding it, by id
+        self.containing = {}
+
+        # Sentences in knowledge that have been emptied but not yet removed
+        self.emptied = 0
+
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
@@ -175,8 +187,9 @@ class MinesweeperAI():
         """
         counter = 0
         self.mines.add(cell)
-        for sentence in self.knowledge:
+        for sentence in self.containing.pop(cell, {}).values():
             counter += sentence.mark_mine(cell)
+            self.changed(sentence)
         return counter
 
     def mark_safe(self, cell):
@@ -186,9 +199,28 @@ class MinesweeperAI():
         """
         counter = 0
         self.safes.add(cell)
-        for sentence in self.knowledge:
+        for sentence in self.containing.pop(cell, {}).values():
             counter += sentence.mark_safe(cell)
+            self.changed(sentence)
         return counter
+
+    def changed(self, sentence):
+        """
+        Queues a sentence that lost a cell, or counts it as emptied.
+        """
+        if sentence.cells:
+            self.queue(sentence)
+        else:
+            self.emptied += 1
+
+    def queue(self, sentence):
+        """
+        Queues a sentence to be checked for conclusions.
+        Sentences are told apart by identity, as their hash changes with their cells.
+        """
+        if id(sentence) not in self.queued:
+            self.queued.add(id(sentence))
+            self.pending.append(sentence)
     
     def find_neighbours(self, cell):
         """
@@ -207,22 +239,85 @@ class MinesweeperAI():
                     continue
         return neighbours
     
-    def update_sentence (self):
+    def add_sentence(self, cells, count):
+        """
+        Adds a sentence about `cells`, leaving out the cells already
+        known to be safe or mines, and queues it.
+        """
+        cells = set(cells) - self.safes
+        mines = cells & self.mines
+        cells -= mines
+        if cells:
+            sentence = Sentence(cells, count - len(mines))
+            self.knowledge.append(sentence)
+            for cell in cells:
+                self.containing.setdefault(cell, {})[id(sentence)] = sentence
+            self.queue(sentence)
+
+    def remove_sentence(self, sentence):
+        """
+        Empties a sentence and takes it out of the index; it is dropped
+        from knowledge the next time that is compacted.
         """
-        Mark cells as safe or mines, and update sentence accordingly if neighbour cell is safe or mine.
+        for cell in sentence.cells:
+            del self.containing[cell][id(sentence)]
+        sentence.cells.clear()
+        sentence.count = 0
+        self.emptied += 1
+
+    def overlapping(self, sentence):
+        """
+        Returns the other sentences sharing a cell with `sentence`.
         """
+        others = {}
+        for cell in sentence.cells:
+            others.update(self.containing[cell])
+        others.pop(id(sentence), None)
+        return list(others.values())
 
-        for sentence in self.knowledge:
-            for cell in sentence.known_mines():
-                self.mark_mine(cell)
-            for cell in sentence.known_safes():
-                self.mark_safe(cell)
+    def update_sentence(self):
+        """
+        Checks queued sentences until none is left: marks the cells they
+        show to be safe or mines, and adds the difference between each one
+        and every sentence it is a subset or superset of, which are
+        found among the sentences it overlaps.
+        Changed and new sentences are queued in turn.
+        """
+        while self.pending:
+            sentence = self.pending.popleft()
+            self.queued.discard(id(sentence))
+            if not sentence.cells:
+                continue
+
+            mines = sentence.known_mines()
+            safes = sentence.known_safes()
+            if mines or safes:
+                for cell in mines:
+                    self.mark_mine(cell)
+                for cell in safes:
+                    self.mark_safe(cell)
+                continue
+
+            others = self.overlapping(sentence)
+
+            # Already known: drop this copy
+            if any(other.cells == sentence.cells for other in others):
+                self.remove_sentence(sentence)
+                continue
+
+            for other in others:
+                if sentence.cells < other.cells:
+                    self.add_sentence(other.cells - sentence.cells,
+                                      other.count - sentence.count)
+                elif other.cells < sentence.cells:
+                    self.add_sentence(sentence.cells - other.cells,
+                                      sentence.count - other.count)
+
+        # remove empty sentences from knowledge base once they are half of it
+        if 2 * self.emptied > len(self.knowledge):
+            self.knowledge = [sentence for sentence in self.knowledge if sentence.cells]
+            self.emptied = 0
 
-        for cell in self.mines:
-            self.mark_mine(cell)
-        for cell in self.safes:
-            self.mark_safe(cell)
-    
     def add_knowledge(self, cell, count):
         """
         Called when the Minesweeper board tells us, for a given
@@ -241,41 +336,15 @@ class MinesweeperAI():
         self.moves_made.add(cell)
 
         # 2) mark the cell as safe
-        self.mark_safe(cell)
-
-        # 3) add new sentence
-        neighbors = self.find_neighbours(cell)
-        remove = set()
-        for neighbor in neighbors:
-            if neighbor in self.moves_made or neighbor in self.safes:
-                remove.add(neighbor)
-        
-        neighbors.difference_update(remove)
-        self.knowledge.append(Sentence(neighbors, count))
+        if cell not in self.safes:
+            self.mark_safe(cell)
 
-        # 4) mark additional cells as safe or mines
-        self.update_sentence()
+        # 3) add new sentence, less the cells already known
+        self.add_sentence(self.find_neighbours(cell) - self.moves_made, count)
 
-        # 5) add any new sentences if they can be inferred
-        new_sentence = []
-     
-        for sentence1 in self.knowledge:
-            for sentence2 in self.knowledge:
-                if sentence1 is sentence2:
-                    continue
-                # if sentence1 is subset of sentence2 
-                elif sentence1 is not sentence2:
-                    if sentence1.cells.issubset(sentence2.cells):
-                        set_diff = sentence2.cells - sentence1.cells
-                        count_diff = sentence2.count - sentence1.count
-                        if Sentence(set_diff,count_diff) not in self.knowledge:
-                            self.knowledge.append(Sentence(set_diff,count_diff))
-        
-        # remove empty sentences knowledge base
-        for sentence in self.knowledge:
-            if sentence == Sentence(set(), 0):
-                self.knowledge.remove(sentence)
-        
+        # 4) and 5) mark additional cells and infer new sentences, looking
+        # only at sentences that changed until nothing more follows
+        self.update_sentence()
 
     def make_safe_move(self):
         """